@@ -0,0 +1,208 @@
+"""
+Benchmarks for the solvers, the generators and the board update path.
+
+    python -m bench.run                          # run and print the results
+    python -m bench.run -o results.json          # also write them as JSON
+    python -m bench.run --baseline bench/baseline.json
+    python -m bench.run --save-baseline          # replace the stored baseline
+
+Comparing against a baseline exits with status 1 if the median time of
+any benchmark got slower than the baseline by more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable
+
+from bench.corpus import HARD_PUZZLES
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.model import (
+    RESEED_EVERY, SOLVER_BACKENDS, BoardModel, PuzzleGenerator, SolutionGenerator, generate_puzzle
+)
+from sudoku.models.notation import from_string
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# clue counts near the 17 clue limit, next to the ones used by the difficulties
+SPARSE_CLUES = (24, 22)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile"""
+
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(seconds: list[float], attempts: list[int] | None = None) -> dict:
+    milliseconds = [s * 1000 for s in seconds]
+    result = {
+        "n": len(milliseconds),
+        "p50_ms": percentile(milliseconds, 50),
+        "p99_ms": percentile(milliseconds, 99),
+        "mean_ms": sum(milliseconds) / len(milliseconds),
+        "max_ms": max(milliseconds),
+    }
+    if attempts is not None:
+        result["attempts"] = {
+            "p50": percentile(attempts, 50),
+            "p99": percentile(attempts, 99),
+            "max": max(attempts),
+            "total": sum(attempts),
+        }
+    return result
+
+
+def timed(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def bench_solution_generator(repeats: int, reseed_every: int = RESEED_EVERY) -> dict:
+    generator = SolutionGenerator(reseed_every=reseed_every)
+    return summarize([timed(generator.create) for _ in range(repeats)])
+
+
+def bench_puzzle_generator(clues: int, repeats: int, order: int = 3) -> dict:
+    seconds, attempts = [], []
+    for _ in range(repeats):
+        generator = PuzzleGenerator(SolutionGenerator(order=order).create())
+        seconds.append(timed(lambda: generator.create(clues)))
+        attempts.append(generator.attempts)
+    return summarize(seconds, attempts)
+
+
+def bench_solver(name: str, repeats: int) -> dict:
+    backend = SOLVER_BACKENDS[name]
+    boards = [from_string(puzzle) for puzzle in HARD_PUZZLES]
+    return summarize([
+        # copied, since the reference solver works on the board it is given
+        timed(lambda: backend([row[:] for row in board]).solve_multiple(limit=2))
+        for board in boards
+        for _ in range(repeats)
+    ])
+
+
+def bench_board(method: str, repeats: int, batch: int = 100) -> dict:
+    """Times BoardModel calls made on every keystroke, per call"""
+
+    board = BoardModel()
+    solution, puzzle = generate_puzzle(Difficulty.EXPERT.clues)
+    board.load_puzzle(solution, puzzle)
+    x, y = next((x, y) for y in range(9) for x in range(9) if not puzzle[y][x])
+
+    def is_complete() -> None:
+        for _ in range(batch):
+            board.is_complete()
+
+    def set_number() -> None:
+        for n in range(batch):
+            board.set_number(x, y, n % 10)
+
+    calls = {"is_complete": is_complete, "set_number": set_number}
+    return summarize([timed(calls[method]) / batch for _ in range(repeats)])
+
+
+def run(quick: bool, solvers: list[str]) -> dict:
+    scale = 1 if quick else 5
+    random.seed(0)
+
+    for _ in range(100): # warm up, so the first benchmark is not penalized
+        generate_puzzle(Difficulty.EASY.clues)
+
+    results = {
+        "solution_generator": bench_solution_generator(1000 * scale),
+        "solution_generator/reseed_1": bench_solution_generator(200 * scale, 1),
+    }
+    for clues in [d.clues for d in Difficulty] + list(SPARSE_CLUES):
+        repeats = (4 if clues in SPARSE_CLUES else 20) * scale
+        results[f"puzzle_generator/{clues}"] = bench_puzzle_generator(clues, repeats)
+    results["puzzle_generator/16x16/110"] = bench_puzzle_generator(110, 2 * scale, order=4)
+    for name in solvers:
+        results[f"solver/{name}"] = bench_solver(name, scale if name != "backtracking" else 1)
+    for method in ("is_complete", "set_number"):
+        results[f"board/{method}"] = bench_board(method, 200 * scale)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Names of the benchmarks whose median is slower than the baseline allows"""
+
+    regressions = []
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is not None and result["p50_ms"] > before["p50_ms"] * threshold:
+            regressions.append(name)
+    return regressions
+
+
+def report(results: dict, baseline: dict | None) -> None:
+    print(f"{'benchmark':<32}{'n':>6}{'p50 ms':>12}{'p99 ms':>12}{'attempts':>10}{'vs base':>10}")
+    for name, result in results["results"].items():
+        attempts = result.get("attempts", {}).get("p99", "")
+        change = ""
+        if baseline is not None and name in baseline["results"]:
+            change = f"{result['p50_ms'] / baseline['results'][name]['p50_ms']:.2f}x"
+        print(
+            f"{name:<32}{result['n']:>6}{result['p50_ms']:>12.4f}"
+            f"{result['p99_ms']:>12.4f}{attempts:>10}{change:>10}"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the sudoku solvers and generators")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against the results in this file")
+    parser.add_argument("--save-baseline", action="store_true",
+        help=f"write the results to {BASELINE}")
+    parser.add_argument("--threshold", type=float, default=1.5,
+        help="slowdown of the median that counts as a regression")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats")
+    parser.add_argument("--solvers", nargs="*", default=["bitmask", "dlx", "propagating"],
+        choices=list(SOLVER_BACKENDS),
+        help="backtracking takes seconds per puzzle, so it is left out by default")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    results = run(args.quick, args.solvers)
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    report(results, baseline)
+
+    for path in [args.output] + [BASELINE] * args.save_baseline:
+        if path is not None:
+            with open(path, "w") as file:
+                json.dump(results, file, indent=2)
+
+    if baseline is not None:
+        if baseline["meta"]["quick"] != args.quick:
+            print("Warning: comparing a --quick run with a full one", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
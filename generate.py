@@ -0,0 +1,172 @@
+"""
+Headless batch generation of puzzles.
+
+Text output holds one puzzle per line as "<puzzle> <solution> <clues>",
+where both grids are 81 characters and empty cells in the puzzle are '.'.
+Bank output is the binary format read by sudoku.models.bank.PuzzleBank.
+
+    python generate.py -n 1000 --difficulty hard expert --clues 25 -o puzzles.txt
+    python generate.py -n 100000 --difficulty expert --format bank -o expert.bank
+    python generate.py -n 1000 --clues 30 --dedup solution -o distinct.txt
+"""
+
+import argparse
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, TextIO
+
+from sudoku.models.bank import BankWriter
+from sudoku.models.canonical import DedupIndex
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.model import (
+    RESEED_EVERY, SOLVER_BACKENDS, GenerationError, PuzzleGenerator, SolutionGenerator, get_solver
+)
+from sudoku.models.notation import to_string
+
+
+Solution = tuple[tuple[int, ...], ...]
+Puzzle = list[list[int]]
+Writer = Callable[[Puzzle, Solution, int], None]
+
+
+def generate_chunk(
+    seed: int, chunk: int, clues: int, count: int, solver: str, symmetric: bool,
+    rating: tuple[int, int] | None = None, reseed_every: int = RESEED_EVERY, dedup: str | None = None
+) -> list[tuple[Puzzle, Solution, bytes | None]]:
+    """
+    Generates `count` puzzles, with the dedup key of every puzzle if asked
+    for. The random state only depends on the seed and the chunk number,
+    so the output does not depend on which worker runs it
+    """
+
+    rng = random.Random(f"{seed}-{chunk}")
+    backend = get_solver(solver)
+    index = DedupIndex(by_solution=dedup == "solution") if dedup is not None else None
+
+    solutions = SolutionGenerator(rng, reseed_every)
+    puzzles = []
+    for _ in range(count):
+        solution = solutions.create()
+        puzzle = PuzzleGenerator(solution, backend, symmetric, rng).create(clues, rating)
+        key = None
+        if index is not None:
+            key = index.key(
+                tuple(value for row in puzzle for value in row),
+                tuple(value for row in solution for value in row)
+            )
+        puzzles.append((puzzle, solution, key))
+    return puzzles
+
+
+def run(args: argparse.Namespace, write: Writer) -> int:
+    """
+    Generates the puzzles and streams them to write, in the order of the
+    chunks. Returns the number written. Duplicates dropped by --dedup are
+    made up for with extra chunks
+    """
+
+    targets = [Difficulty[name.upper()].clues for name in args.difficulty] + args.clues
+    max_pending = args.workers * 2 # keeps memory bounded for very large runs
+    index = DedupIndex(by_solution=args.dedup == "solution") if args.dedup is not None else None
+
+    written = 0
+    chunk = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for clues in targets:
+            kept = 0
+            planned = 0 # puzzles in the pending chunks
+            pending: deque[tuple[Future[list[tuple[Puzzle, Solution, bytes | None]]], int]] = deque()
+            while kept < args.count:
+                while len(pending) < max_pending and kept + planned < args.count:
+                    count = min(args.chunk_size, args.count - kept - planned)
+                    pending.append((executor.submit(
+                        generate_chunk, args.seed, chunk, clues, count, args.solver,
+                        args.symmetric, args.rating, args.reseed_every, args.dedup
+                    ), count))
+                    chunk += 1
+                    planned += count
+
+                future, count = pending.popleft()
+                planned -= count
+                for puzzle, solution, key in future.result():
+                    if key is None or index is None or index.add_key(key):
+                        write(puzzle, solution, clues)
+                        kept += 1
+            written += kept
+    return written
+
+
+def text_writer(output: TextIO) -> Writer:
+    def write(puzzle: Puzzle, solution: Solution, clues: int) -> None:
+        output.write(f"{to_string(puzzle)} {to_string(solution)} {clues}\n")
+    return write
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate sudoku puzzles in bulk")
+    parser.add_argument("-n", "--count", type=int, default=1,
+        help="puzzles per difficulty or clue count")
+    parser.add_argument("-d", "--difficulty", nargs="*", default=[],
+        choices=[d.name.lower() for d in Difficulty])
+    parser.add_argument("-c", "--clues", nargs="*", type=int, default=[])
+    parser.add_argument("-o", "--output", help="output file, defaults to stdout")
+    parser.add_argument("-f", "--format", choices=["text", "bank"], default="text")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--solver", default="bitmask", choices=list(SOLVER_BACKENDS))
+    parser.add_argument("--symmetric", action="store_true")
+    parser.add_argument("--rating", nargs=2, type=int, metavar=("LOWEST", "HIGHEST"),
+        help="only keep puzzles with a logical solver score in this range")
+    parser.add_argument("--dedup", choices=["puzzle", "solution"],
+        help="drop puzzles equivalent to an earlier one under the sudoku symmetries, "
+        "or whose solution is")
+    parser.add_argument("--reseed-every", type=int, metavar="N",
+        help="fill a new seed grid every N solutions, the others are symmetric transforms of it "
+        f"(default {RESEED_EVERY}, or 1 with --dedup solution)")
+
+    args = parser.parse_args(argv)
+    if not args.difficulty and not args.clues:
+        args.difficulty = [Difficulty.EASY.name.lower()]
+    if any(clues < 17 for clues in args.clues):
+        parser.error("There is no valid sudoku with fewer than 17 clues")
+    if any(clues > 81 for clues in args.clues):
+        parser.error("A sudoku has at most 81 clues")
+    if args.format == "bank" and args.output is None:
+        parser.error("A bank has to be written to a file, use --output")
+    if args.reseed_every is not None and args.reseed_every < 1:
+        parser.error("--reseed-every has to be at least 1")
+    if args.dedup == "solution":
+        if args.reseed_every is not None and args.reseed_every > 1:
+            parser.error("--dedup solution drops every solution made from the same seed grid")
+        args.reseed_every = 1
+    elif args.reseed_every is None:
+        args.reseed_every = RESEED_EVERY
+    if args.rating is not None:
+        if args.rating[0] > args.rating[1]:
+            parser.error("The lowest --rating has to be at most the highest")
+        args.rating = tuple(args.rating)
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    try:
+        if args.format == "bank":
+            with BankWriter(args.output) as bank:
+                written = run(args, lambda puzzle, solution, _: bank.add(puzzle, solution))
+        elif args.output is None:
+            written = run(args, text_writer(sys.stdout))
+        else:
+            with open(args.output, "w") as output:
+                written = run(args, text_writer(output))
+    except GenerationError as error: # fx a rating that no puzzle of the clue count gets
+        sys.exit(f"Generation failed: {error}")
+    print(f"Generated {written} puzzles", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
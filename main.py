@@ -1,13 +1,37 @@
+import time
+STARTED = time.perf_counter() # before the imports below, which are part of the startup time
+
+import logging
+import os
+
+from sudoku.stats import STATS
 from sudoku.views.view import MainView
 from sudoku.controllers.controller import MainController
 from sudoku.models.model import MainModel
 
 
 def main():
-    model = MainModel()
+    # SUDOKU_STATS=<seconds> logs the stats at that interval,
+    # SUDOKU_STATS_FILE=<path> also writes them there as JSON
+    interval = os.environ.get("SUDOKU_STATS")
+    if interval:
+        logging.basicConfig(level=logging.INFO)
+        STATS.enable()
+        STATS.start_reporting(float(interval), os.environ.get("SUDOKU_STATS_FILE"))
+
+    # SUDOKU_SERVER=<host:port or socket path> gets the puzzles from serve.py
+    address = os.environ.get("SUDOKU_SERVER")
+    generate = None
+    if address:
+        from sudoku.service import PuzzleClient # asyncio and multiprocessing are slow to import
+
+        generate = PuzzleClient(address).generate
+
+    # SUDOKU_CACHE=<directory> keeps the puzzles loaded by ID there, and can be shared
+    model = MainModel(generate=generate, cache_directory=os.environ.get("SUDOKU_CACHE"))
     view = MainView(model)
     controller = MainController(model, view)
-    controller.start_game()
+    controller.start_game(STARTED)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""
+Runs the puzzle service, so many clients can share one warm pool of
+generator processes. See sudoku.service for the protocol.
+
+    python serve.py --address 127.0.0.1:8765 --workers 4
+    python serve.py --address /tmp/sudoku.sock
+    SUDOKU_SERVER=127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from sudoku.models.model import SOLVER_BACKENDS
+from sudoku.service import PuzzleServer
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve sudoku generation and solving")
+    parser.add_argument("-a", "--address", default="127.0.0.1:8765",
+        help="host:port to listen on, or the path of a Unix socket")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--solver", default="bitmask", choices=list(SOLVER_BACKENDS))
+    parser.add_argument("--max-batch", type=int, default=16,
+        help="most requests sent to a worker at once")
+    parser.add_argument("--linger", type=float, default=0.002,
+        help="seconds to collect requests before sending them to the workers")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = PuzzleServer(args.workers, args.solver, args.max_batch, args.linger)
+    await server.start(args.address)
+    print(f"Serving on {server.address}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
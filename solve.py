@@ -0,0 +1,188 @@
+"""
+Streaming bulk solving and checking of puzzle files.
+
+Reads one puzzle per line from files or stdin: 81 characters with '.' or
+'0' for empty cells, and anything after the first whitespace ignored, so
+the output of generate.py can be read back. Blank lines and lines starting
+with '#' are skipped. One line is written per puzzle, in input order:
+
+    <puzzle> <status> <solution, or - if there is none>
+
+With --check the status is unique, multiple or unsolvable, otherwise it
+is solved or unsolvable. Lines that are not a puzzle get the status invalid.
+With --batch every chunk is propagated at once with NumPy first, and only
+the puzzles left open are searched by the solver.
+Input is read in chunks and only a few chunks per worker are in flight at a
+time, so memory stays bounded however large the input is.
+
+    python solve.py puzzles.txt -o solved.txt
+    python solve.py --batch --check bank.txt > audit.txt
+    zcat dump.txt.gz | python solve.py --check --solver propagating > audit.txt
+"""
+
+import argparse
+import itertools
+import os
+import sys
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator, TextIO
+
+from sudoku.models.model import SOLVER_BACKENDS, SolverBackend, get_solver
+from sudoku.models.notation import from_string, to_string
+
+
+class Status: # constants
+    SOLVED = "solved"
+    UNIQUE = "unique"
+    MULTIPLE = "multiple"
+    UNSOLVABLE = "unsolvable"
+    INVALID = "invalid"
+
+
+def solve_line(line: str, backend: SolverBackend, is_check: bool) -> tuple[str, str]:
+    """Returns the status of the puzzle on a line and its output line"""
+
+    puzzle = line.split(maxsplit=1)[0]
+    try:
+        board = from_string(puzzle)
+    except ValueError:
+        return Status.INVALID, f"{puzzle} {Status.INVALID} -\n"
+
+    solver = backend(board)
+    status = status_of(solver.solve_multiple(limit=2 if is_check else 1), is_check)
+    solution = to_string(solver.solution) if solver.solution is not None else "-"
+    return status, f"{to_string(board)} {status} {solution}\n"
+
+
+def status_of(count: int, is_check: bool) -> str:
+    if count == 0:
+        return Status.UNSOLVABLE
+    if not is_check:
+        return Status.SOLVED
+    return Status.UNIQUE if count == 1 else Status.MULTIPLE
+
+
+def solve_batch_chunk(lines: list[str], backend: SolverBackend, is_check: bool) -> tuple[str, Counter[str]]:
+    """Like solve_chunk, but the puzzles are propagated together with NumPy"""
+
+    from sudoku.models.batch import solve_batch # NumPy is only needed for --batch
+
+    boards = []
+    for line in lines:
+        try:
+            boards.append(from_string(line.split(maxsplit=1)[0]))
+        except ValueError:
+            boards.append(None)
+    valid = [board for board in boards if board is not None]
+    result = solve_batch(valid, limit=2 if is_check else 1, solver=backend) if valid else None
+
+    statuses: Counter[str] = Counter()
+    output = []
+    solved = 0
+    for line, board in zip(lines, boards):
+        if board is None:
+            status, text = Status.INVALID, f"{line.split(maxsplit=1)[0]} {Status.INVALID} -\n"
+        else:
+            count = int(result.counts[solved])
+            status = status_of(count, is_check)
+            solution = to_string(result.solutions[solved].tolist()) if count else "-"
+            text = f"{to_string(board)} {status} {solution}\n"
+            solved += 1
+        statuses[status] += 1
+        output.append(text)
+    return "".join(output), statuses
+
+
+def solve_chunk(lines: list[str], solver: str, is_check: bool, is_batch: bool = False) -> tuple[str, Counter[str]]:
+    """Runs in a worker. Returns the output of a chunk as one string, and the statuses"""
+
+    backend = get_solver(solver)
+    if is_batch:
+        return solve_batch_chunk(lines, backend, is_check)
+    statuses: Counter[str] = Counter()
+    output = []
+    for line in lines:
+        status, result = solve_line(line, backend, is_check)
+        statuses[status] += 1
+        output.append(result)
+    return "".join(output), statuses
+
+
+def read_puzzles(inputs: Iterable[TextIO]) -> Iterator[str]:
+    """The puzzle lines of every input, lazily"""
+
+    for file in inputs:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def run(args: argparse.Namespace, lines: Iterable[str], output: TextIO) -> Counter[str]:
+    """
+    Solves the lines in chunks on the workers and writes the results in
+    input order. No more input is read while the window of chunks in
+    flight is full. Returns the number of puzzles of every status
+    """
+
+    max_pending = args.workers * 2 # keeps memory bounded for very large inputs
+    statuses: Counter[str] = Counter()
+    puzzles = iter(lines)
+    chunks = iter(lambda: list(itertools.islice(puzzles, args.chunk_size)), [])
+
+    def write_next() -> None:
+        text, chunk_statuses = pending.popleft().result()
+        output.write(text)
+        statuses.update(chunk_statuses)
+
+    pending: deque[Future[tuple[str, Counter[str]]]] = deque()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for chunk in chunks:
+            if len(pending) == max_pending:
+                write_next()
+            pending.append(executor.submit(solve_chunk, chunk, args.solver, args.check, args.batch))
+        while pending:
+            write_next()
+    return statuses
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Solve or check sudoku puzzles in bulk")
+    parser.add_argument("inputs", nargs="*", default=["-"],
+        help="puzzle files, - or none for stdin")
+    parser.add_argument("-o", "--output", help="output file, defaults to stdout")
+    parser.add_argument("--check", action="store_true",
+        help="tell unique puzzles from those with several solutions")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--solver", default="bitmask", choices=list(SOLVER_BACKENDS))
+    parser.add_argument("--batch", action="store_true",
+        help="propagate every chunk at once with NumPy, searching only the puzzles left open")
+
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size have to be at least 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    inputs = [sys.stdin if name == "-" else open(name) for name in args.inputs]
+    try:
+        if args.output is None:
+            statuses = run(args, read_puzzles(inputs), sys.stdout)
+        else:
+            with open(args.output, "w") as output:
+                statuses = run(args, read_puzzles(inputs), output)
+    finally:
+        for file in inputs:
+            if file is not sys.stdin:
+                file.close()
+
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(statuses.items()))
+    print(f"Read {sum(statuses.values())} puzzles: {summary or 'none'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
+import logging
+import threading
+import time
 import tkinter as tk
+from concurrent.futures import Future
 from enum import Enum, auto
 
 from sudoku.views.view import Difficulty, MainView, BoardView, Width, DifficultyMenu
-from sudoku.models.model import MainModel, BoardModel
+from sudoku.models.cancel import CancelToken
+from sudoku.models.model import GenerationError, MainModel, BoardModel
+from sudoku.stats import STATS
 
 
 class State(Enum):
@@ -10,6 +16,15 @@ class State(Enum):
     PLAYING = auto()
 
 
+class Generation: # constants
+    TIMEOUT = 10.0 # seconds a new puzzle may take, after that the current one is kept
+    POLL_MS = 20 # how often the GUI checks if the new puzzle is ready
+
+
+class Startup: # constants
+    BUDGET = 1.0 # seconds from the start of the process to the first frame, a warning is logged above it
+
+
 def run_if_state_is_playing(func):
     def wrapper(self, *args, **kwargs):
         if self.state == State.PLAYING:
@@ -25,18 +40,35 @@ class MainController:
         self.board_view: BoardView = self.view.board
         self.difficulty_menu: DifficultyMenu = self.view.difficulty_menu
         self.state = State.PLAYING
+        self._generation: CancelToken | None = None # of the puzzle being made, if any
+        self._is_pool_reserved = False
 
         self._setup_on_difficulty_change()
         self._setup_new_game()
 
-        # set initial game
-        self._update_difficulty()
+    def start_game(self, started: float | None = None) -> None:
+        """
+        Shows the window and starts making the first puzzle once it is up,
+        so the window does not wait for it. `started` is the perf_counter
+        time the program started at, for measuring the time to the first frame
+        """
 
-    def start_game(self) -> None:
         self._setup_keybinds()
 
+        self.view.after_idle(lambda: self._start_first_game(started))
         self.view.run()
 
+    def _start_first_game(self, started: float | None) -> None:
+        if started is not None:
+            seconds = time.perf_counter() - started
+            if STATS.enabled:
+                STATS.record("startup.first_frame", seconds)
+            if seconds > Startup.BUDGET:
+                logging.getLogger(__name__).warning(
+                    "The first frame took %.2f s, the budget is %.2f s", seconds, Startup.BUDGET
+                )
+        self._update_difficulty()
+
     def _setup_keybinds(self) -> None:
 
         # did not work with for-loop...
@@ -51,6 +83,11 @@ class MainController:
         self.view.bind_key("8", lambda _: self._handle_number_input(8))
         self.view.bind_key("9", lambda _: self._handle_number_input(9))
 
+        self.view.bind_key("h", lambda _: self._handle_hint())
+        self.view.bind_key("n", lambda _: self.board_view.toggle_notes())
+        self.view.bind_key("<Control-z>", lambda _: self._handle_undo())
+        self.view.bind_key("<Control-y>", lambda _: self._handle_redo())
+
         self.view.bind_key("<Button-1>", self._handle_mouse_click)
 
         self.view.bind_key("<Up>", lambda _: self._handle_move_cursor(0, -1))
@@ -67,22 +104,57 @@ class MainController:
     def _setup_on_difficulty_change(self) -> None:
         self.difficulty_menu.bind_update_difficulty(self._update_difficulty)
 
+    def _setup_puzzle_pool(self) -> None:
+        """Have puzzles for every difficulty ready before they are asked for"""
+
+        for difficulty in Difficulty:
+            self.model.puzzle_pool.reserve(difficulty.clues)
+
     def _update_difficulty(self, *_) -> None:
-        difficulty: Difficulty = self.difficulty_menu.get_current_difficulty()
+        """
+        Starts making a puzzle of the chosen difficulty off the GUI thread.
+        A puzzle still being made for an earlier choice is cancelled
+        """
 
-        clues = 38
-        match difficulty:
-            case Difficulty.EASY:
-                clues = 38
-            case Difficulty.MEDIUM:
-                clues = 36
-            case Difficulty.HARD:
-                clues = 34
-            case Difficulty.EXPERT:
-                clues = 31
-
-        self.board_model.create_puzzle(clues=clues)
-        self.board_view.update_board()
+        difficulty: Difficulty = self.difficulty_menu.get_current_difficulty()
+        if self._generation is not None:
+            self._generation.cancel()
+        token = CancelToken()
+        self._generation = token
+
+        future: Future = Future()
+        deadline = time.monotonic() + Generation.TIMEOUT
+
+        def find() -> None:
+            try:
+                future.set_result(
+                    self.board_model.find_puzzle(difficulty.clues, deadline=deadline, cancel=token)
+                )
+            except Exception as error:
+                future.set_exception(error)
+
+        threading.Thread(target=find, name="puzzle-generation", daemon=True).start()
+        self._load_when_ready(future, token)
+
+    def _load_when_ready(self, future: Future, token: CancelToken) -> None:
+        """Loads the new puzzle on the GUI thread, unless a newer one was asked for"""
+
+        if token is not self._generation:
+            return
+        if not future.done():
+            self.view.after(Generation.POLL_MS, lambda: self._load_when_ready(future, token))
+            return
+
+        self._generation = None
+        if not self._is_pool_reserved: # after the first puzzle, so the pool does not slow it down
+            self._setup_puzzle_pool()
+            self._is_pool_reserved = True
+        try:
+            self.board_model.load_puzzle(*future.result()) # redraws through the board listener
+        except GenerationError as error:
+            logging.getLogger(__name__).warning("Keeping the current puzzle: %s", error)
+            return
+        self.board_view.hide_win_screen()
         self.state = State.PLAYING
 
     @run_if_state_is_playing
@@ -93,11 +165,13 @@ class MainController:
     def _move_cursor_with_mouse(self, event: tk.Event) -> None:
 
         # check if mouse clicked on the board and not the margin around
-        x_is_on_board = (Width.MARGIN < event.x < Width.GRID + Width.MARGIN)
-        y_is_on_board = (Width.MARGIN < event.y < Width.GRID + Width.MARGIN)
+        cell_width = self.board_view.cell_width
+        grid = self.board_view.size * cell_width
+        x_is_on_board = (Width.MARGIN < event.x < grid + Width.MARGIN)
+        y_is_on_board = (Width.MARGIN < event.y < grid + Width.MARGIN)
         if x_is_on_board and y_is_on_board:
-            y = (event.y - Width.MARGIN) // Width.CELL
-            x = (event.x - Width.MARGIN) // Width.CELL
+            y = (event.y - Width.MARGIN) // cell_width
+            x = (event.x - Width.MARGIN) // cell_width
             self.board_view.update_cursor(x, y)
 
 
@@ -105,19 +179,60 @@ class MainController:
     def _handle_number_input(self, number: int) -> None:
         """Used for binding (0-9) key press to insert (1-9 or clearing cell) into board"""
 
+        start = time.perf_counter() if STATS.enabled else 0.0
         x, y = self.board_view.get_cursor()
         if x is None or y is None:
             raise ValueError("The cursor is broken")
 
         elif not self.board_model.get_cell(x, y).is_clue:
             self._insert_number(x, y, number)
+            if STATS.enabled:
+                self._record_redraw("controller.keystroke_to_redraw", start)
+
+    def _record_redraw(self, name: str, start: float) -> None:
+        """
+        Records the time from start until tk is idle again. The canvas
+        redraws in an idle callback queued by the changes, so it runs first
+        """
+
+        self.view.after_idle(lambda: STATS.record(name, time.perf_counter() - start))
+
+    @run_if_state_is_playing
+    def _handle_hint(self) -> None:
+        """Moves the cursor to the next forced move and fills it in"""
+
+        start = time.perf_counter() if STATS.enabled else 0.0
+        hint = self.board_model.get_hint()
+        if hint is not None:
+            self.board_view.update_cursor(hint.x, hint.y)
+            self._insert_number(hint.x, hint.y, hint.number)
+            if STATS.enabled:
+                self._record_redraw("controller.hint_to_redraw", start)
+
+    @run_if_state_is_playing
+    def _handle_undo(self) -> None:
+        """Takes back the last move and moves the cursor to its cell"""
+
+        cell = self.board_model.undo()
+        if cell is not None:
+            self.board_view.update_cursor(*cell)
+
+    @run_if_state_is_playing
+    def _handle_redo(self) -> None:
+        """Makes the last undone move again and moves the cursor to its cell"""
+
+        cell = self.board_model.redo()
+        if cell is not None:
+            self.board_view.update_cursor(*cell)
+            self._check_win()
 
     def _insert_number(self, x: int, y: int, number: int) -> None:
         """Process inserting a number into the selected cell"""
 
-        self.board_model.get_cell(x, y).current = number
-        self.board_view.update_board()
+        self.board_model.set_number(x, y, number)
+        self._check_win()
 
+    def _check_win(self) -> None:
         if self.board_model.is_complete():
             self.view.show_win_page()
             self.state = State.HAS_WON
@@ -128,7 +243,7 @@ class MainController:
 
         current_row, current_column = self.board_view.get_cursor()
         if current_row is not None and current_column is not None:
-            upper = 8 # upper index bound
+            upper = self.board_view.size - 1 # upper index bound
             lower = 0 # lower index bound
 
             new_row = max(lower, min(upper, current_row + x_delta))
@@ -0,0 +1,168 @@
+import mmap
+import random
+import struct
+from array import array
+from typing import BinaryIO
+
+
+Solution = tuple[tuple[int, ...], ...]
+Puzzle = list[list[int]]
+
+
+class BankFormat: # constants
+    """
+    Layout of a puzzle bank file:
+
+        header   magic, version, record count, index offset, index entries
+        records  9x9 puzzle and solution, 41 bytes each with two cells per byte
+        index    (clues, first, count) entries, then the record numbers
+                 of every clue count as uint32
+    """
+    MAGIC = b"SDKB"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHxxQQI4x") # 32 bytes
+    INDEX_ENTRY = struct.Struct("<HxxIQ") # 16 bytes
+    GRID_SIZE = 41 # 81 cells at 4 bits each
+    RECORD_SIZE = 2 * GRID_SIZE
+
+
+# every byte unpacked to its two cells
+_NIBBLES = tuple((byte >> 4, byte & 0x0F) for byte in range(256))
+
+
+def pack_grid(grid: Solution | Puzzle) -> bytes:
+    cells = [value for row in grid for value in row] + [0]
+    return bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2))
+
+
+def unpack_grid(data: bytes | memoryview) -> list[list[int]]:
+    cells = [value for byte in data for value in _NIBBLES[byte]]
+    return [cells[r * 9:r * 9 + 9] for r in range(9)]
+
+
+class BankWriter:
+    """Appends puzzles to a new bank file. The index is written on close"""
+
+    def __init__(self, path: str) -> None:
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(bytes(BankFormat.HEADER.size)) # filled in on close
+        self._count = 0
+        self._index: dict[int, array] = {}
+
+    def __enter__(self) -> "BankWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def add(self, puzzle: Puzzle, solution: Solution) -> int:
+        """Writes a record and returns its number"""
+
+        clues = sum(value != 0 for row in puzzle for value in row)
+        self._file.write(pack_grid(puzzle))
+        self._file.write(pack_grid(solution))
+        self._index.setdefault(clues, array("I")).append(self._count)
+        self._count += 1
+        return self._count - 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+
+        # pad so the uint32 record numbers are aligned
+        self._file.write(bytes(-self._file.tell() % 4))
+        index_offset = self._file.tell()
+
+        first = 0
+        for clues in sorted(self._index):
+            self._file.write(BankFormat.INDEX_ENTRY.pack(clues, first, len(self._index[clues])))
+            first += len(self._index[clues])
+        for clues in sorted(self._index):
+            self._file.write(self._index[clues].tobytes())
+
+        self._file.seek(0)
+        self._file.write(BankFormat.HEADER.pack(
+            BankFormat.MAGIC, BankFormat.VERSION, self._count, index_offset, len(self._index)
+        ))
+        self._file.close()
+
+
+class PuzzleBank:
+    """
+    Read-only, memory-mapped puzzle bank. Opening only reads the header and
+    the index table, records are unpacked when they are asked for
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._count, index_offset, entries = BankFormat.HEADER.unpack_from(self._map)
+        if magic != BankFormat.MAGIC or version != BankFormat.VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {BankFormat.VERSION} puzzle bank")
+
+        numbers_offset = index_offset + entries * BankFormat.INDEX_ENTRY.size
+        self._numbers = memoryview(self._map)[numbers_offset:].cast("I")
+        self._by_clues: dict[int, memoryview] = {}
+        for n in range(entries):
+            clues, first, count = BankFormat.INDEX_ENTRY.unpack_from(
+                self._map, index_offset + n * BankFormat.INDEX_ENTRY.size
+            )
+            self._by_clues[clues] = self._numbers[first:first + count]
+
+    def __enter__(self) -> "PuzzleBank":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        for numbers in self._by_clues.values():
+            numbers.release()
+        self._by_clues = {}
+        self._numbers.release() # the map can not close while views are exported
+        self._map.close()
+
+    def clue_counts(self) -> list[int]:
+        return list(self._by_clues)
+
+    def count(self, clues: int) -> int:
+        """Number of puzzles with the given number of clues"""
+
+        numbers = self._by_clues.get(clues)
+        return len(numbers) if numbers is not None else 0
+
+    def get(self, k: int) -> tuple[Solution, Puzzle]:
+        """Returns (solution, puzzle) of record k"""
+
+        if not 0 <= k < self._count:
+            raise IndexError(f"Puzzle {k} is not in the bank")
+        offset = BankFormat.HEADER.size + k * BankFormat.RECORD_SIZE
+        puzzle = unpack_grid(self._map[offset:offset + BankFormat.GRID_SIZE])
+        offset += BankFormat.GRID_SIZE
+        solution = unpack_grid(self._map[offset:offset + BankFormat.GRID_SIZE])
+        return tuple(tuple(row) for row in solution), puzzle
+
+    def records(self) -> memoryview:
+        """
+        The packed records of the whole bank, for reading them all at once.
+        The view has to be released before the bank is closed
+        """
+
+        start = BankFormat.HEADER.size
+        return memoryview(self._map)[start:start + self._count * BankFormat.RECORD_SIZE]
+
+    def get_by_clues(self, clues: int, n: int) -> tuple[Solution, Puzzle]:
+        """Returns the n'th puzzle with the given number of clues"""
+
+        return self.get(self._by_clues[clues][n])
+
+    def random(self, clues: int, rng=random) -> tuple[Solution, Puzzle]:
+        count = self.count(clues)
+        if count == 0:
+            raise KeyError(f"No puzzles with {clues} clues in the bank")
+        return self.get_by_clues(clues, rng.randrange(count))
@@ -0,0 +1,114 @@
+"""
+Solving and checking many 9x9 puzzles at once with NumPy, for whole banks.
+
+The candidates of every board are kept in one boolean array and naked and
+hidden singles are applied to all of them in each step, as array operations
+over the rows, columns and boxes. Most generated puzzles are solved that way.
+Only the boards with cells left open are searched, one at a time, by a
+solver backend. NumPy is an optional dependency: pip install 'sudoku[numpy]'
+"""
+
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("Batch solving needs NumPy, install it with: pip install 'sudoku[numpy]'") from error
+
+from sudoku.models.solver import UNITS, BitmaskSolver, SolverBackend
+
+
+CHUNK_SIZE = 4096 # boards propagated together, which bounds the memory used
+
+_UNITS = np.array(UNITS) # (27, 9) cell indexes of the rows, columns and boxes
+# the 3 units of every cell and the cell's position in each of them, both (81, 3)
+_UNITS_OF_CELL = np.array([[u for u, unit in enumerate(UNITS) if i in unit] for i in range(81)])
+_POSITION_IN_UNIT = np.array([[UNITS[u].index(i) for u in units] for i, units in enumerate(_UNITS_OF_CELL)])
+
+
+class BatchResult(NamedTuple):
+    solutions: np.ndarray # (N, 9, 9), the first solution found, or zeros when there is none
+    counts: np.ndarray # (N,) solutions found, up to the limit
+    searched: np.ndarray # (N,) True for the boards that propagation alone could not solve
+
+
+def _step(candidates: np.ndarray) -> np.ndarray:
+    """One round of naked and hidden singles on (n, 81, 9) candidates"""
+
+    # naked singles: a digit fixed in a cell is removed from its peers
+    fixed = candidates & (candidates.sum(axis=2) == 1)[:, :, None]
+    fixed_in_unit = fixed[:, _UNITS].sum(axis=2) # (n, 27, 9)
+    # every cell is in 3 units, so its own fixed digit is counted 3 times
+    fixed_by_peers = fixed_in_unit[:, _UNITS_OF_CELL].sum(axis=2) - 3 * fixed
+    candidates = candidates & (fixed_by_peers == 0)
+
+    # hidden singles: a digit with one place left in a unit goes there
+    in_unit = candidates[:, _UNITS] # (n, 27, 9 cells, 9 digits)
+    hidden = in_unit & (in_unit.sum(axis=2) == 1)[:, :, None, :]
+    hidden_in_cell = hidden[:, _UNITS_OF_CELL, _POSITION_IN_UNIT].any(axis=2) # (n, 81, 9)
+    return np.where(hidden_in_cell.any(axis=2)[:, :, None], hidden_in_cell, candidates)
+
+
+def propagate(puzzles: np.ndarray) -> np.ndarray:
+    """
+    The (N, 81, 9) candidates of (N, 9, 9) puzzles after naked and hidden
+    singles have been applied until nothing changes. A cell without
+    candidates means the puzzle has no solution
+    """
+
+    cells = puzzles.reshape(len(puzzles), 81)
+    candidates = np.where((cells == 0)[:, :, None], True, cells[:, :, None] == np.arange(1, 10))
+
+    active = np.arange(len(candidates)) # the boards that changed in the last step
+    while active.size:
+        before = candidates[active]
+        after = _step(before)
+        candidates[active] = after
+        active = active[(after != before).any(axis=(1, 2))]
+    return candidates
+
+
+def _check_shape(puzzles: np.ndarray) -> np.ndarray:
+    puzzles = np.asarray(puzzles)
+    if puzzles.ndim != 3 or puzzles.shape[1:] != (9, 9):
+        raise ValueError(f"Expected an (N, 9, 9) array of puzzles, got the shape {puzzles.shape}")
+    if puzzles.size and (puzzles.min() < 0 or puzzles.max() > 9):
+        raise ValueError("The cells of a puzzle have to be 0 (empty) or 1-9")
+    return puzzles.astype(np.int8)
+
+
+def solve_batch(
+    puzzles: np.ndarray, limit: int = 1, solver: SolverBackend = BitmaskSolver
+) -> BatchResult:
+    """
+    Solves an (N, 9, 9) integer array of puzzles, with 0 for empty cells.
+    A board solved by propagation has exactly 1 solution. The others are
+    searched by `solver` for up to `limit` solutions, so 2 tells unique
+    puzzles from those with several
+    """
+
+    puzzles = _check_shape(puzzles)
+    if limit < 1:
+        raise ValueError("The limit has to be at least 1")
+    solutions = np.zeros(puzzles.shape, dtype=np.int8)
+    counts = np.zeros(len(puzzles), dtype=np.int64)
+    searched = np.zeros(len(puzzles), dtype=bool)
+
+    for start in range(0, len(puzzles), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        candidates = propagate(puzzles[chunk])
+        left = candidates.sum(axis=2)
+        values = np.where(left == 1, candidates.argmax(axis=2) + 1, 0).reshape(-1, 9, 9)
+        clashes = (left == 0).any(axis=1) | (candidates[:, _UNITS].sum(axis=2) == 0).any(axis=(1, 2))
+        solved = (left == 1).all(axis=1) & ~clashes
+        solutions[chunk][solved] = values[solved]
+        counts[chunk][solved] = 1
+
+        open_boards = ~solved & ~clashes
+        searched[chunk] = open_boards
+        for i in np.flatnonzero(open_boards):
+            board_solver = solver(values[i].tolist())
+            counts[start + i] = board_solver.solve_multiple(limit)
+            if board_solver.solution is not None:
+                solutions[start + i] = board_solver.solution
+    return BatchResult(solutions, counts, searched)
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.notation import from_string, to_string
+
+
+Solution = tuple[tuple[int, ...], ...]
+Puzzle = list[list[int]]
+
+# bump when a change to the generators gives an ID a different puzzle,
+# so cached puzzles of the old generator are not mixed with new ones
+GENERATOR_VERSION = 2
+
+
+class PuzzleId(NamedTuple):
+    """A seed and a clue count, which always generate the same 9x9 puzzle"""
+    seed: int
+    clues: int
+
+    @classmethod
+    def for_difficulty(cls, seed: int, difficulty: Difficulty) -> "PuzzleId":
+        return cls(seed, difficulty.clues)
+
+    @classmethod
+    def parse(cls, text: str) -> "PuzzleId":
+        """Reads "<clues>-<seed>", where the clues can also be a difficulty like "expert-42" """
+
+        clues, _, seed = text.strip().partition("-")
+        if not seed.isdigit():
+            raise ValueError(f"Not a puzzle ID: {text!r}")
+        if clues.isdigit():
+            return cls(int(seed), int(clues))
+        try:
+            return cls.for_difficulty(int(seed), Difficulty[clues.upper()])
+        except KeyError:
+            raise ValueError(f"Not a puzzle ID: {text!r}") from None
+
+    def __str__(self) -> str:
+        return f"{self.clues}-{self.seed}"
+
+    @property
+    def rng_seed(self) -> str:
+        """Seed for the random.Random the puzzle is generated with"""
+
+        return f"{GENERATOR_VERSION}-{self}"
+
+    @property
+    def key(self) -> str:
+        """Cache key, the same on every host that runs the same generator version"""
+
+        return hashlib.sha256(self.rng_seed.encode()).hexdigest()
+
+
+class PuzzleCache:
+    """
+    Puzzles by ID, so a known puzzle is a lookup instead of a search. The
+    last `size` are kept in memory and, if a directory is given, every
+    puzzle is written there as <key>.txt, which can be shared between hosts
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[PuzzleId], tuple[Solution, Puzzle]],
+        directory: str | None = None,
+        size: int = 256
+    ) -> None:
+        self._generate = generate # makes the (solution, puzzle) pair of an ID
+        self._directory = directory
+        self._size = size
+        self._memory: OrderedDict[str, tuple[Solution, Puzzle]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, puzzle_id: PuzzleId) -> tuple[Solution, Puzzle]:
+        """Returns the (solution, puzzle) of an ID, generating it on a miss"""
+
+        key = puzzle_id.key
+        with self._lock:
+            pair = self._memory.get(key)
+            if pair is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._copy(pair)
+
+        pair = self._read(key)
+        is_hit = pair is not None
+        if pair is None:
+            pair = self._generate(puzzle_id)
+            self._write(key, pair)
+
+        with self._lock:
+            if is_hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._memory[key] = pair
+            while len(self._memory) > self._size:
+                self._memory.popitem(last=False)
+        return self._copy(pair)
+
+    def _copy(self, pair: tuple[Solution, Puzzle]) -> tuple[Solution, Puzzle]:
+        """The puzzle is a list that the caller may change, the cached one must stay"""
+
+        solution, puzzle = pair
+        return solution, [row[:] for row in puzzle]
+
+    def _path(self, key: str) -> str:
+        assert self._directory is not None
+        return os.path.join(self._directory, f"{key}.txt")
+
+    def _read(self, key: str) -> tuple[Solution, Puzzle] | None:
+        if self._directory is None:
+            return None
+        try:
+            with open(self._path(key)) as file:
+                puzzle, solution = file.read().split()
+            return tuple(tuple(row) for row in from_string(solution)), from_string(puzzle)
+        except (OSError, ValueError): # missing, or a broken file that is generated again
+            return None
+
+    def _write(self, key: str, pair: tuple[Solution, Puzzle]) -> None:
+        if self._directory is None:
+            return
+        solution, puzzle = pair
+        # written next to the final file and renamed, so readers never see half of it
+        temporary = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as file:
+            file.write(f"{to_string(puzzle)} {to_string(solution)}\n")
+        os.replace(temporary, self._path(key))
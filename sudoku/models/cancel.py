@@ -0,0 +1,19 @@
+import threading
+
+
+class CancelToken:
+    """
+    Lets one thread tell a long running job in another, fx a puzzle being
+    generated, that its result is no longer wanted. The job checks it
+    between steps and stops at the next one
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
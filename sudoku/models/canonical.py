@@ -0,0 +1,214 @@
+"""
+Canonical forms under the sudoku symmetry group (transposition, band,
+stack, row and column permutations and relabeling), 9x9 only.
+
+The canonical form of a solution is the smallest of its ~3.3M equivalent
+grids, read row by row. Row 1 of that grid is always 123456789, since the
+digits are relabeled in the order they first appear, so the search starts
+at row 2: for every choice of the first two rows, the columns are placed
+one position at a time, keeping only the placements that give the
+smallest row 2 so far. Very few are left by the end of row 2, and every
+one of them fixes the order of the remaining rows.
+
+A puzzle is canonicalized through its (unique) solution: of the transforms
+giving the canonical solution, the one that gives the smallest puzzle wins.
+"""
+
+import hashlib
+
+from sudoku.models.solver import BitmaskSolver
+from sudoku.models.symmetry import Cells, Transform
+
+
+# a candidate being refined: (transposed, first three rows, stack of every slot,
+# slot of every stack, column of every position, position of every column,
+# row 2 so far, the second row as a permutation of the columns of the first)
+_State = tuple[
+    bool, tuple[int, int, int], list[int], list[int], list[int], list[int], list[int],
+    tuple[int, ...]
+]
+
+
+def _start_states(grid: Cells) -> list[_State]:
+    """A candidate for every transposition and choice of the first two rows"""
+
+    states = []
+    for transposed in (False, True):
+        def at(row: int, column: int) -> int:
+            return grid[column * 9 + row] if transposed else grid[row * 9 + column]
+
+        for first in range(9):
+            band = first // 3 * 3
+            column_of = [0] * 10 # where every digit is in the first row
+            for column in range(9):
+                column_of[at(first, column)] = column
+            for second in range(band, band + 3):
+                if second != first:
+                    third = 3 * band + 3 - first - second
+                    image = tuple(column_of[at(second, column)] for column in range(9))
+                    states.append((
+                        transposed, (first, second, third),
+                        [-1] * 3, [-1] * 3, [-1] * 9, [-1] * 9, [], image
+                    ))
+    return states
+
+
+def _is_pure(image: tuple[int, ...], stack: int) -> bool:
+    """If the second row takes the digits of a whole stack from a single box of the first"""
+
+    return image[stack * 3] // 3 == image[stack * 3 + 1] // 3 == image[stack * 3 + 2] // 3
+
+
+def _row_two_states(grid: Cells) -> list[_State]:
+    """The candidates whose column order gives the smallest row 2"""
+
+    states = _start_states(grid)
+
+    # row 2 can only start with 456 if a pure stack goes first, and
+    # there almost always is one, so the others are dropped right away
+    pure = {
+        (n, stack) for n, state in enumerate(states) for stack in range(3)
+        if _is_pure(state[7], stack)
+    }
+
+    for position in range(9):
+        slot = position // 3
+        best = 10
+        children = []
+        for n, (transposed, rows, stack_of_slot, slot_of_stack, column_at, position_of, row, image) in enumerate(states):
+            if column_at[position] >= 0:
+                choices: tuple[int, ...] = (column_at[position],)
+            elif stack_of_slot[slot] >= 0:
+                stack = stack_of_slot[slot] * 3
+                choices = tuple(c for c in range(stack, stack + 3) if position_of[c] < 0)
+            elif position == 0 and pure:
+                choices = tuple(c for c in range(9) if (n, c // 3) in pure)
+            else:
+                choices = tuple(c for c in range(9) if slot_of_stack[c // 3] < 0)
+
+            for column in choices:
+                stacks, slots = stack_of_slot[:], slot_of_stack[:]
+                columns, positions = column_at[:], position_of[:]
+                if slots[column // 3] < 0:
+                    slots[column // 3], stacks[slot] = slot, column // 3
+                columns[position], positions[column] = column, position
+
+                # the value here is the position of the column holding the same
+                # digit in row 1, so that column goes to the first place it can
+                target = image[column]
+                if positions[target] < 0:
+                    target_slot = slots[target // 3]
+                    if target_slot < 0:
+                        target_slot = stacks.index(-1)
+                        slots[target // 3], stacks[target_slot] = target_slot, target // 3
+                    start = target_slot * 3
+                    free = next(p for p in range(start, start + 3) if columns[p] < 0)
+                    columns[free], positions[target] = target, free
+                value = positions[target]
+
+                if value < best:
+                    best, children = value, []
+                if value == best:
+                    children.append((
+                        transposed, rows, stacks, slots, columns, positions, row + [value], image
+                    ))
+        states = children
+    return states
+
+
+def canonical_transforms(solution: Cells) -> tuple[Cells, list[Transform]]:
+    """
+    The canonical form of a solution and every transform that gives it
+    (more than one if the grid has automorphisms)
+    """
+
+    best: Cells | None = None
+    transforms: list[Transform] = []
+    for transposed, rows, _, _, column_at, position_of, _, _ in _row_two_states(solution):
+        def source(r: int, c: int) -> int:
+            return c * 9 + r if transposed else r * 9 + c
+
+        # label every digit by the position of its column in the first row
+        digits = [0] * 10
+        for column in range(9):
+            digits[solution[source(rows[0], column)]] = position_of[column] + 1
+
+        def relabeled(r: int) -> tuple[int, ...]:
+            return tuple(digits[solution[source(r, c)]] for c in column_at)
+
+        # the remaining rows of every band in order, then the bands in order
+        first_band = rows[0] // 3
+        bands = sorted(
+            sorted(range(band * 3, band * 3 + 3), key=relabeled)
+            for band in range(3) if band != first_band
+        )
+        bands.sort(key=lambda band: [relabeled(r) for r in band])
+        order = [*rows, *bands[0], *bands[1]]
+
+        cells = tuple(value for r in order for value in relabeled(r))
+        if best is None or cells < best:
+            best, transforms = cells, []
+        if cells == best:
+            transforms.append(Transform(
+                tuple(source(r, c) for r in order for c in column_at), tuple(digits)
+            ))
+    assert best is not None
+    return best, transforms
+
+
+def canonical_grid(solution: Cells) -> Cells:
+    return canonical_transforms(solution)[0]
+
+
+def canonical_puzzle(puzzle: Cells, solution: Cells | None = None) -> tuple[Cells, Cells]:
+    """
+    The canonical (puzzle, solution) of a puzzle with a unique solution.
+    The solution is found with BitmaskSolver if it is not given
+    """
+
+    if solution is None:
+        solver = BitmaskSolver([list(puzzle[r * 9:r * 9 + 9]) for r in range(9)])
+        if solver.solve_multiple(limit=2) != 1:
+            raise ValueError("Only puzzles with exactly one solution have a canonical form")
+        assert solver.solution is not None
+        solution = tuple(value for row in solver.solution for value in row)
+
+    grid, transforms = canonical_transforms(solution)
+    return min(transform.apply(puzzle) for transform in transforms), grid
+
+
+def canonical_key(cells: Cells) -> bytes:
+    """Short hash of a canonical form, for indexes"""
+
+    return hashlib.blake2b(bytes(cells), digest_size=16).digest()
+
+
+class DedupIndex:
+    """
+    Hashes of the canonical forms seen so far, so equivalent puzzles are
+    only kept once. With by_solution, puzzles are duplicates when their
+    solutions are equivalent, even if different cells were emptied
+    """
+
+    def __init__(self, by_solution: bool = False) -> None:
+        self._by_solution = by_solution
+        self._keys: set[bytes] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def key(self, puzzle: Cells, solution: Cells) -> bytes:
+        if self._by_solution:
+            return canonical_key(canonical_grid(solution))
+        return canonical_key(canonical_puzzle(puzzle, solution)[0])
+
+    def add_key(self, key: bytes) -> bool:
+        """Adds a key made by `key`. Returns False if it was already there"""
+
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def add(self, puzzle: Cells, solution: Cells) -> bool:
+        return self.add_key(self.key(puzzle, solution))
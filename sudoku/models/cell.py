@@ -1,24 +1,34 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sudoku.models.model import BoardModel
+
+
 class CellModel:
-    def __init__(self, solution: int, current: int, is_clue: bool) -> None:
-        self._solution = solution
-        self._current = current
-        self._is_clue = is_clue
+    """
+    Lightweight view of a single cell. The values themselves are stored
+    in the flat buffer of the BoardModel it belongs to
+    """
+
+    __slots__ = ("_board", "_x", "_y")
+
+    def __init__(self, board: "BoardModel", x: int, y: int) -> None:
+        self._board = board
+        self._x = x
+        self._y = y
 
     @property
     def solution(self) -> int:
-        return self._solution
+        return self._board.get_solution(self._x, self._y)
 
     @property
     def current(self) -> int:
-        return self._current
+        return self._board.get_number(self._x, self._y)
 
     @current.setter
     def current(self, value: int) -> None:
-        valid_values = list(range(0, 10, 1))
-        if value not in valid_values:
-            raise ValueError("Tried to insert invalid number")
-        self._current = value
+        self._board.set_number(self._x, self._y, value)
 
     @property
     def is_clue(self) -> bool:
-        return self._is_clue
+        return self._board.is_clue(self._x, self._y)
@@ -0,0 +1,24 @@
+from enum import Enum
+
+
+class Difficulty(Enum):
+    EASY   = "Easy"
+    MEDIUM = "Medium"
+    HARD   = "Hard"
+    EXPERT = "Expert"
+
+    @property
+    def clues(self) -> int:
+        """Number of clues in a puzzle of this difficulty"""
+
+        clues = 38
+        match self:
+            case Difficulty.EASY:
+                clues = 38
+            case Difficulty.MEDIUM:
+                clues = 36
+            case Difficulty.HARD:
+                clues = 34
+            case Difficulty.EXPERT:
+                clues = 31
+        return clues
@@ -0,0 +1,208 @@
+import functools
+
+from sudoku.models.solver import count_nodes, order_of, record_solve
+from sudoku.stats import STATS
+
+
+class Constraint: # constants
+    """Sections of the matrix columns, one column per cell, row, column and box each"""
+    CELL = 0 # cell i has a digit
+    ROW = 1 # row r has digit d
+    COLUMN = 2
+    BOX = 3
+    SECTIONS = 4
+
+
+@functools.cache
+def _build_matrix(order: int) -> tuple[list[int], ...]:
+    """
+    Builds the exact cover matrix of an empty board as flat link arrays.
+    Node 0 is the root, then come the column headers, 4 * cells of them
+    (324 for 9x9), and every candidate (row, column, digit) adds four
+    linked nodes, one per satisfied constraint
+    """
+
+    size = order * order
+    cells = size * size
+    count = Constraint.SECTIONS * cells
+    left = list(range(-1, count))
+    right = list(range(1, count + 2))
+    left[0], right[count] = count, 0
+    up = list(range(count + 1))
+    down = list(range(count + 1))
+    column = list(range(count + 1))
+    sizes = [0] * (count + 1)
+    candidate = [-1] * (count + 1)
+
+    for r in range(size):
+        for c in range(size):
+            b = (r // order) * order + c // order
+            for d in range(size):
+                first = len(left)
+                headers = (
+                    1 + Constraint.CELL * cells + r * size + c,
+                    1 + Constraint.ROW * cells + r * size + d,
+                    1 + Constraint.COLUMN * cells + c * size + d,
+                    1 + Constraint.BOX * cells + b * size + d,
+                )
+                for k, header in enumerate(headers):
+                    node = first + k
+                    left.append(first + (k - 1) % 4)
+                    right.append(first + (k + 1) % 4)
+                    up.append(up[header])
+                    down.append(header)
+                    down[up[header]] = node
+                    up[header] = node
+                    column.append(header)
+                    candidate.append((r * size + c) * size + d)
+                    sizes[header] += 1
+
+    return left, right, up, down, column, sizes, candidate
+
+
+class DancingLinksSolver:
+    """
+    Exact cover solver using Knuth's Algorithm X on dancing links.
+    Same contract as BitmaskSolver: the board is left untouched, the
+    first solution is stored in `self.solution` and any box order works
+    """
+
+    nodes = 0 # only counted while stats are enabled
+    backtracks = 0
+
+    def __init__(self, board: list[list[int]]) -> None:
+        self.board = board
+        self.solution: list[list[int]] | None = None
+
+        order = order_of(len(board))
+        self._board_size = order * order
+        self._headers = Constraint.SECTIONS * self._board_size ** 2
+        left, right, up, down, column, size, candidate = _build_matrix(order)
+        self._left, self._right = left[:], right[:]
+        self._up, self._down = up[:], down[:]
+        self._size = size[:]
+        self._column = column
+        self._candidate = candidate
+
+        self._chosen: list[int] = []
+        n = self._board_size
+        self._is_consistent = all(len(row) == n for row in board)
+        if self._is_consistent:
+            for r in range(n):
+                for c in range(n):
+                    if board[r][c]:
+                        self._is_consistent &= (
+                            0 < board[r][c] <= n and self._select((r * n + c) * n + board[r][c] - 1)
+                        )
+
+    def solve_multiple(self, limit: int | None = None) -> int:
+        """
+        Counts the solutions of the board, stopping as soon as `limit`
+        solutions are found
+        """
+
+        if not self._is_consistent:
+            return 0
+        self._limit = limit if limit is not None else -1
+        self._found = 0
+        is_counted = STATS.enabled
+        if is_counted:
+            count_nodes(self)
+        self._search()
+        if is_counted:
+            record_solve(self)
+        return self._found
+
+    def _select(self, index: int) -> bool:
+        """Removes the columns covered by a given clue from the matrix"""
+
+        node = self._headers + 1 + index * 4
+        for header in (self._column[node + k] for k in range(4)):
+            if self._left[self._right[header]] != header: # already covered
+                return False
+            self._cover(header)
+        self._chosen.append(index)
+        return True
+
+    def _search(self) -> bool:
+        """Returns True when the solution limit has been reached"""
+
+        right, down, size, column = self._right, self._down, self._size, self._column
+
+        if right[0] == 0:
+            self._found += 1
+            if self.solution is None:
+                n = self._board_size
+                cells = [0] * (n * n)
+                for index in self._chosen:
+                    cells[index // n] = index % n + 1
+                self.solution = [cells[r * n:r * n + n] for r in range(n)]
+            return self._found == self._limit
+
+        # choose the column with the fewest remaining rows
+        header, best = 0, self._board_size + 1
+        h = right[0]
+        while h != 0:
+            if size[h] < best:
+                header, best = h, size[h]
+                if best <= 1:
+                    break
+            h = right[h]
+        if best == 0:
+            return False
+
+        self._cover(header)
+        row = down[header]
+        while row != header:
+            self._chosen.append(self._candidate[row])
+            j = right[row]
+            while j != row:
+                self._cover(column[j])
+                j = right[j]
+
+            is_done = self._search()
+
+            j = self._left[row]
+            while j != row:
+                self._uncover(column[j])
+                j = self._left[j]
+            self._chosen.pop()
+            if is_done:
+                self._uncover(header)
+                return True
+            row = down[row]
+
+        self._uncover(header)
+        return False
+
+    def _cover(self, header: int) -> None:
+        left, right, up, down, column, size = (
+            self._left, self._right, self._up, self._down, self._column, self._size
+        )
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, header: int) -> None:
+        left, right, up, down, column, size = (
+            self._left, self._right, self._up, self._down, self._column, self._size
+        )
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
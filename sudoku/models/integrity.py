@@ -0,0 +1,96 @@
+"""
+Vectorized integrity checks of many 9x9 puzzles and their solutions with
+NumPy, for certifying whole banks before they are shipped. Every check is
+a few array operations over all grids, and the bad ones are reported by
+index. NumPy is an optional dependency: pip install 'sudoku[numpy]'
+"""
+
+from typing import Iterable, NamedTuple
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("Integrity checks need NumPy, install it with: pip install 'sudoku[numpy]'") from error
+
+from sudoku.models.bank import BankFormat, PuzzleBank
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.solver import UNITS, Mask
+
+
+CHUNK_SIZE = 65536 # grids checked together, which bounds the memory used
+
+_UNITS = np.array(UNITS) # (27, 9) cell indexes of the rows, columns and boxes
+
+
+class IntegrityReport(NamedTuple):
+    invalid_solutions: np.ndarray # indexes of solutions that are not a valid sudoku
+    wrong_clues: np.ndarray # indexes of puzzles with a clue that differs from the solution
+    wrong_clue_counts: np.ndarray # indexes of puzzles with a clue count that is not allowed
+
+    @property
+    def is_ok(self) -> bool:
+        return not (self.invalid_solutions.size or self.wrong_clues.size or self.wrong_clue_counts.size)
+
+
+def invalid_solutions(solutions: np.ndarray) -> np.ndarray:
+    """
+    Which of (N, 9, 9) solutions are not a valid sudoku, as an (N,) boolean
+    array. A unit of 9 cells holds every digit once exactly when the bits
+    of its digits add up to all 9 digits
+    """
+
+    cells = np.asarray(solutions).reshape(-1, 81).astype(np.int16)
+    in_range = (cells >= 1) & (cells <= 9)
+    bits = np.where(in_range, np.left_shift(1, np.clip(cells, 0, 9), dtype=np.int16), 0)
+    used = np.bitwise_or.reduce(bits[:, _UNITS], axis=2) # (N, 27)
+    return ~in_range.all(axis=1) | (used != Mask.ALL_DIGITS).any(axis=1)
+
+
+def check(
+    puzzles: np.ndarray, solutions: np.ndarray, clues: Iterable[int] | None = None
+) -> IntegrityReport:
+    """
+    Checks (N, 9, 9) puzzles, with 0 for empty cells, against their
+    solutions: that the solutions are valid, that every clue is the number
+    of the solution and that the clue counts are allowed ones, by default
+    those of the difficulties
+    """
+
+    puzzles, solutions = np.asarray(puzzles), np.asarray(solutions)
+    if puzzles.shape != solutions.shape or puzzles.ndim != 3 or puzzles.shape[1:] != (9, 9):
+        raise ValueError(
+            f"Expected two (N, 9, 9) arrays of the same shape, got {puzzles.shape} and {solutions.shape}"
+        )
+    allowed = np.array(sorted({d.clues for d in Difficulty} if clues is None else set(clues)))
+
+    bad_solutions, bad_clues, bad_counts = [], [], []
+    for start in range(0, len(puzzles), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        puzzle, solution = puzzles[chunk], solutions[chunk]
+        is_clue = puzzle != 0
+        bad_solutions.append(invalid_solutions(solution))
+        bad_clues.append((is_clue & (puzzle != solution)).any(axis=(1, 2)))
+        bad_counts.append(~np.isin(is_clue.sum(axis=(1, 2)), allowed))
+
+    def indexes(masks: list[np.ndarray]) -> np.ndarray:
+        return np.flatnonzero(np.concatenate(masks)) if masks else np.zeros(0, dtype=np.intp)
+
+    return IntegrityReport(indexes(bad_solutions), indexes(bad_clues), indexes(bad_counts))
+
+
+def load_bank(bank: PuzzleBank) -> tuple[np.ndarray, np.ndarray]:
+    """All (puzzles, solutions) of a bank as two (N, 9, 9) arrays, unpacked at once"""
+
+    with bank.records() as records:
+        packed = np.frombuffer(records, dtype=np.uint8).reshape(len(bank), 2, BankFormat.GRID_SIZE)
+        # two cells per byte, the first in the high half, and a padding cell at the end
+        cells = np.stack((packed >> 4, packed & 0x0F), axis=3).reshape(len(bank), 2, -1)[:, :, :81]
+        del packed # releases the records
+    grids = cells.reshape(len(bank), 2, 9, 9)
+    return grids[:, 0], grids[:, 1]
+
+
+def check_bank(bank: PuzzleBank, clues: Iterable[int] | None = None) -> IntegrityReport:
+    """Checks every record of a bank, reported by record number"""
+
+    return check(*load_bank(bank), clues)
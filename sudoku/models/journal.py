@@ -0,0 +1,80 @@
+from array import array
+from typing import Callable
+
+
+class MoveJournal:
+    """
+    The moves of a game as (cell, old, new) deltas, so a move is undone or
+    redone without copying the board. Every SNAPSHOT_EVERY moves the current
+    numbers are saved as well, so any point of a long game is reached from
+    the nearest snapshot in at most SNAPSHOT_EVERY steps
+    """
+
+    SNAPSHOT_EVERY = 256 # moves between snapshots
+
+    def __init__(self, numbers: Callable[[], bytes]) -> None:
+        self._numbers = numbers # the current numbers of the board, for the snapshots
+        self._moves = array("H") # cell, old and new number of every move
+        self._position = 0 # moves in effect, the ones after it have been undone
+        self._snapshots = [numbers()] # the numbers after k * SNAPSHOT_EVERY moves
+
+    def __len__(self) -> int:
+        """Moves recorded, including undone ones that can still be redone"""
+
+        return len(self._moves) // 3
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def record(self, cell: int, old: int, new: int) -> None:
+        """Adds a move that has just been made. The undone moves can not be redone after it"""
+
+        if 3 * self._position < len(self._moves):
+            del self._moves[3 * self._position:]
+            del self._snapshots[self._position // self.SNAPSHOT_EVERY + 1:]
+        self._moves.extend((cell, old, new))
+        self._position += 1
+        if self._position % self.SNAPSHOT_EVERY == 0:
+            self._snapshots.append(self._numbers())
+
+    def undo(self) -> tuple[int, int] | None:
+        """The (cell, number) that takes back the last move, or None at the start"""
+
+        if not self._position:
+            return None
+        self._position -= 1
+        k = 3 * self._position
+        return self._moves[k], self._moves[k + 1]
+
+    def redo(self) -> tuple[int, int] | None:
+        """The (cell, number) that makes the last undone move again, or None if there is none"""
+
+        if self._position == len(self):
+            return None
+        k = 3 * self._position
+        self._position += 1
+        return self._moves[k], self._moves[k + 2]
+
+    def seek(self, position: int) -> tuple[bytes | None, list[tuple[int, int]]]:
+        """
+        How to get from the current position to another one: the snapshot to
+        restore first, if that is shorter than stepping there, and the
+        (cell, number) steps to take after it
+        """
+
+        if not 0 <= position <= len(self):
+            raise ValueError(f"There is no move {position}, the journal has {len(self)}")
+        moves = self._moves
+        start = position - position % self.SNAPSHOT_EVERY # the last snapshot before it
+
+        snapshot = None
+        if abs(position - self._position) > position - start:
+            snapshot = self._snapshots[start // self.SNAPSHOT_EVERY]
+            self._position = start
+        if position < self._position: # back, undoing moves
+            steps = [(moves[k], moves[k + 1]) for k in range(3 * self._position - 3, 3 * position - 1, -3)]
+        else:
+            steps = [(moves[k], moves[k + 2]) for k in range(3 * self._position, 3 * position, 3)]
+        self._position = position
+        return snapshot, steps
@@ -1,159 +1,947 @@
+import functools
 import random
-from copy import deepcopy
+import time
+from array import array
+from typing import Callable, NamedTuple
 
+from sudoku.models.bank import PuzzleBank
+from sudoku.models.cache import PuzzleCache, PuzzleId
+from sudoku.models.cancel import CancelToken
 from sudoku.models.cell import CellModel
+from sudoku.models.dlx import DancingLinksSolver
+from sudoku.models.journal import MoveJournal
+from sudoku.models.pool import PuzzlePool
+from sudoku.models.rater import LogicalSolver, Technique, rate
+from sudoku.models.symmetry import random_transform
+from sudoku.models.solver import (
+    BitmaskSolver, PropagatingSolver, SearchLimitError, SolverBackend, fill_grid, get_geometry,
+    order_of, record_solve
+)
+from sudoku.stats import STATS
 
 
 class BoardValue: # constants
     EMPTY_CELL = 0
 
 
+class BoardLayout: # constants
+    """Sections of the flat board buffer, one byte per cell each, so section k starts at k * cells"""
+    SOLUTION = 0
+    CURRENT = 1
+    CLUE = 2
+    SECTIONS = 3
+
+
+class Hint(NamedTuple):
+    x: int
+    y: int
+    number: int
+    technique: Technique | None # None if the hint fixes a mistake or could not be found by logic
+
+
 class BoardModel:
-    def __init__(self) -> None:
-        self._board: list[list[CellModel]] = [
-            [CellModel(BoardValue.EMPTY_CELL, BoardValue.EMPTY_CELL, False)
-                for _ in range(9)]
-            for _ in range(9)
-        ]
+    """
+    The board being played, of any box order: order 3 is the usual 9x9,
+    4 gives 16x16 with the numbers 1-16 and so on. The pool, bank and
+    cache hold 9x9 puzzles, so only a board of order 3 can use them
+    """
+
+    def __init__(
+        self,
+        pool: PuzzlePool | None = None,
+        bank: PuzzleBank | None = None,
+        cache: PuzzleCache | None = None,
+        order: int = 3
+    ) -> None:
+        if order != 3 and (pool, bank, cache) != (None, None, None):
+            raise ValueError("Puzzle pools, banks and caches are 9x9 only")
+        self._pool = pool
+        self._bank = bank
+        self._cache = cache
+        self.puzzle_id: PuzzleId | None = None # set while a puzzle loaded by ID is played
+        self._listeners: list[Callable[[int, int], None]] = []
+
+        geometry = get_geometry(order)
+        self._geometry = geometry
+        self._row_of, self._column_of, self._box_of = geometry.row_of, geometry.column_of, geometry.box_of
+        self._peers = geometry.peers
+        self._current = BoardLayout.CURRENT * geometry.cells # where the sections start
+        self._clue = BoardLayout.CLUE * geometry.cells
+
+        # solution, current number and clue flag of every cell in one buffer
+        self._cells = bytearray(BoardLayout.SECTIONS * geometry.cells)
+        self._reset_tracking()
+        self._journal = MoveJournal(self._numbers)
+
+    @property
+    def order(self) -> int:
+        return self._geometry.order
+
+    @property
+    def size(self) -> int:
+        """Rows, columns and numbers of the board, fx 9"""
+
+        return self._geometry.size
+
+    @property
+    def journal(self) -> MoveJournal:
+        """The moves played on the current puzzle, started anew when one is loaded"""
+
+        return self._journal
 
     def is_complete(self) -> bool:
-        for y in range(9):
-            for x in range(9):
-                cell = self._board[y][x]
-                if cell.current != cell.solution:
-                    return False
-        return True
+        return self._correct == self._geometry.cells
 
     def get_cell(self, x: int, y: int) -> CellModel:
-        return self._board[y][x]
-
-    def create_puzzle(self, clues: int = 80) -> None:
-        if clues < 17: # https://doi.org/10.48550/arXiv.1201.0749
-            raise ValueError("There is no valid sudoku with fewer than 17 clues")
-        solution = SolutionGenerator().create()
-        puzzle = PuzzleGenerator(solution).create(clues)
-        for y in range(9):
-            for x in range(9):
-                self._board[y][x] = CellModel(
-                    solution[y][x],
-                    puzzle[y][x],
-                    (puzzle[y][x] != BoardValue.EMPTY_CELL)
-                )
+        return CellModel(self, x, y)
+
+    def get_solution(self, x: int, y: int) -> int:
+        return self._cells[y * self._geometry.size + x]
+
+    def get_number(self, x: int, y: int) -> int:
+        return self._cells[self._current + y * self._geometry.size + x]
+
+    def is_clue(self, x: int, y: int) -> bool:
+        return self._cells[self._clue + y * self._geometry.size + x] != 0
+
+    def snapshot(self) -> bytes:
+        """Copy of the whole board, which can be given back to restore"""
+
+        return bytes(self._cells)
+
+    def restore(self, snapshot: bytes) -> None:
+        if len(snapshot) != len(self._cells):
+            raise ValueError("Not a board snapshot")
+        self._cells[:] = snapshot
+        self._reset_tracking()
+        self._journal = MoveJournal(self._numbers)
+        self._notify_all()
+
+    def add_listener(self, listener: Callable[[int, int], None]) -> None:
+        """Calls listener(x, y) every time the cell at (x, y) changes"""
+
+        self._listeners.append(listener)
+
+    def _notify(self, x: int, y: int) -> None:
+        for listener in self._listeners:
+            listener(x, y)
+
+    def _notify_all(self) -> None:
+        size = self._geometry.size
+        for y in range(size):
+            for x in range(size):
+                self._notify(x, y)
+
+    def _numbers(self) -> bytes:
+        """The current number of every cell, for the journal snapshots"""
+
+        return bytes(self._cells[self._current:self._clue])
+
+    def set_number(self, x: int, y: int, number: int) -> None:
+        """Changes the current number of a cell and records the move in the journal"""
+
+        size = self._geometry.size
+        if not BoardValue.EMPTY_CELL <= number <= size:
+            raise ValueError("Tried to insert invalid number")
+
+        i = y * size + x
+        old = self._cells[self._current + i]
+        if old == number:
+            return
+        self._change(i, number)
+        self._journal.record(i, old, number)
+
+    def undo(self) -> tuple[int, int] | None:
+        """Takes back the last move and returns the (x, y) of its cell, or None if there is none"""
+
+        return self._step(self._journal.undo())
+
+    def redo(self) -> tuple[int, int] | None:
+        """Makes the last undone move again and returns the (x, y) of its cell, or None if there is none"""
+
+        return self._step(self._journal.redo())
+
+    def go_to_move(self, position: int) -> None:
+        """
+        Puts the board as it was after that many moves of the journal,
+        from the nearest journal snapshot if that takes fewer steps
+        """
+
+        snapshot, steps = self._journal.seek(position)
+        if snapshot is not None:
+            self._cells[self._current:self._clue] = snapshot
+            self._reset_tracking()
+            self._notify_all()
+        for i, number in steps:
+            self._change(i, number)
+
+    def _step(self, step: tuple[int, int] | None) -> tuple[int, int] | None:
+        if step is None:
+            return None
+        i, number = step
+        self._change(i, number)
+        size = self._geometry.size
+        return i % size, i // size
+
+    def _change(self, i: int, number: int) -> None:
+        """Changes the current number of cell i and updates the tracked occupancy"""
+
+        old = self._cells[self._current + i]
+        if old != BoardValue.EMPTY_CELL:
+            self._remove(i, old)
+        self._cells[self._current + i] = number
+        if number != BoardValue.EMPTY_CELL:
+            self._add(i, number)
+
+        solution = self._cells[i]
+        self._correct += (number == solution) - (old == solution)
+        if number != BoardValue.EMPTY_CELL and number != solution:
+            self._mistakes.add(i)
+        else:
+            self._mistakes.discard(i)
+
+        # playing a deduced number leaves the other deductions valid
+        if self._deductions.pop(i, (None,))[0] != number:
+            self._deductions.clear()
+
+        self._update_candidates(i)
+        for j in self._peers[i]:
+            self._update_candidates(j)
+        size = self._geometry.size
+        self._notify(i % size, i // size)
+
+    def is_conflicting(self, x: int, y: int, number: int) -> bool:
+        """Checks if number is already used by another cell in the row, column or box of (x, y)"""
+
+        if number == BoardValue.EMPTY_CELL:
+            return False
+        size = self._geometry.size
+        i = y * size + x
+        own = self._cells[self._current + i] == number # do not count the cell itself
+        stride = size + 1
+        return (
+            self._row_counts[self._row_of[i] * stride + number] > own
+            or self._column_counts[self._column_of[i] * stride + number] > own
+            or self._box_counts[self._box_of[i] * stride + number] > own
+        )
+
+    def get_conflicts(self) -> set[tuple[int, int]]:
+        """Cells (x, y) whose number is also used in their row, column or box"""
+
+        size = self._geometry.size
+        return {(i % size, i // size) for i in self._conflicting}
+
+    def get_candidates(self, x: int, y: int) -> list[int]:
+        """Numbers that can go in an empty cell without a conflict (pencil marks)"""
+
+        size = self._geometry.size
+        mask = self._candidates[y * size + x]
+        return [number for number in range(1, size + 1) if mask >> number & 1]
+
+    def get_hint(self) -> Hint | None:
+        """
+        The next move that is forced by the current numbers. Mistakes are
+        pointed out first, since nothing is forced on a board that has them
+        """
+
+        size = self._geometry.size
+        if self._mistakes:
+            i = min(self._mistakes)
+            return Hint(i % size, i // size, self._cells[i], None)
+
+        if self._singles:
+            i = min(self._singles)
+            number = self._candidates[i].bit_length() - 1
+            return Hint(i % size, i // size, number, Technique.NAKED_SINGLE)
+
+        candidates = self._candidates
+        for unit in self._geometry.units:
+            once = twice = 0
+            for i in unit:
+                twice |= once & candidates[i]
+                once |= candidates[i]
+            hidden = once & ~twice
+            if hidden:
+                bit = hidden & -hidden
+                i = next(i for i in unit if candidates[i] & bit)
+                return Hint(i % size, i // size, bit.bit_length() - 1, Technique.HIDDEN_SINGLE)
+
+        return self._get_logical_hint()
+
+    def _get_logical_hint(self) -> Hint | None:
+        """
+        Falls back to the logical solver when no single is left. It only
+        runs up to the first cells it can place, and those are kept until
+        the board changes in another way than by playing one of them
+        """
+
+        size = self._geometry.size
+        empty = [i for i in range(self._geometry.cells) if not self._cells[self._current + i]]
+        if not empty:
+            return None
+
+        if not self._deductions and self.order == 3: # the logical solver only knows 9x9
+            current = self._cells[self._current:self._clue]
+            solver = LogicalSolver([list(current[r * 9:r * 9 + 9]) for r in range(9)])
+            self._deductions = solver.next_placements()
+
+        if self._deductions:
+            # the cell with the fewest candidates is the easiest one to explain
+            i = min(self._deductions, key=lambda i: self._candidates[i].bit_count())
+            number, technique = self._deductions[i]
+            return Hint(i % size, i // size, number, technique)
+
+        # beyond the techniques, so the hint can only give the answer away
+        i = min(empty, key=lambda i: self._candidates[i].bit_count())
+        return Hint(i % size, i // size, self._cells[i], None)
+
+    def _reset_tracking(self) -> None:
+        """Rebuilds the occupancy counts from the cells"""
+
+        size, cells = self._geometry.size, self._geometry.cells
+        row_of, column_of, box_of = self._row_of, self._column_of, self._box_of
+        stride = size + 1
+
+        # counts of every number (0 to size) in every row, column and box
+        self._row_counts = bytearray(size * stride)
+        self._column_counts = bytearray(size * stride)
+        self._box_counts = bytearray(size * stride)
+        self._peer_conflicts = bytearray(cells) # peers with the same number
+        self._conflicting: set[int] = set()
+        self._mistakes: set[int] = set() # filled in with a wrong number
+
+        # bitmasks of the numbers used in every row, column and box
+        self._row_used = [0] * size
+        self._column_used = [0] * size
+        self._box_used = [0] * size
+        self._candidates = array("L", bytes(array("L").itemsize * cells))
+        self._singles: set[int] = set() # empty cells with one candidate
+        # cells the logical solver placed from the current numbers, with (number, technique)
+        self._deductions: dict[int, tuple[int, Technique]] = {}
+
+        current = self._cells[self._current:self._clue]
+        solution = self._cells[:self._current]
+        self._correct = sum(a == b for a, b in zip(current, solution))
+        for i in range(cells):
+            number = current[i]
+            if number != BoardValue.EMPTY_CELL:
+                self._row_counts[row_of[i] * stride + number] += 1
+                self._column_counts[column_of[i] * stride + number] += 1
+                self._box_counts[box_of[i] * stride + number] += 1
+                self._peer_conflicts[i] = sum(current[j] == number for j in self._peers[i])
+                if self._peer_conflicts[i]:
+                    self._conflicting.add(i)
+                if number != solution[i]:
+                    self._mistakes.add(i)
+
+                bit = 1 << number
+                self._row_used[row_of[i]] |= bit
+                self._column_used[column_of[i]] |= bit
+                self._box_used[box_of[i]] |= bit
+
+        for i in range(cells):
+            self._update_candidates(i)
+
+    def _update_candidates(self, i: int) -> None:
+        if self._cells[self._current + i] != BoardValue.EMPTY_CELL:
+            mask = 0
+        else:
+            mask = self._geometry.all_digits & ~(
+                self._row_used[self._row_of[i]]
+                | self._column_used[self._column_of[i]]
+                | self._box_used[self._box_of[i]]
+            )
+        self._candidates[i] = mask
+
+        if mask and not mask & (mask - 1):
+            self._singles.add(i)
+        else:
+            self._singles.discard(i)
+
+    def _add(self, i: int, number: int) -> None:
+        stride = self._geometry.size + 1
+        row, column, box = self._row_of[i], self._column_of[i], self._box_of[i]
+        self._row_counts[row * stride + number] += 1
+        self._column_counts[column * stride + number] += 1
+        self._box_counts[box * stride + number] += 1
+
+        bit = 1 << number
+        self._row_used[row] |= bit
+        self._column_used[column] |= bit
+        self._box_used[box] |= bit
+
+        cells, current = self._cells, self._current
+        conflicts = 0
+        for j in self._peers[i]:
+            if cells[current + j] == number:
+                conflicts += 1
+                self._peer_conflicts[j] += 1
+                self._conflicting.add(j)
+        self._peer_conflicts[i] = conflicts
+        if conflicts:
+            self._conflicting.add(i)
+
+    def _remove(self, i: int, number: int) -> None:
+        stride = self._geometry.size + 1
+        row, column, box = (
+            self._row_of[i] * stride, self._column_of[i] * stride, self._box_of[i] * stride
+        )
+        self._row_counts[row + number] -= 1
+        self._column_counts[column + number] -= 1
+        self._box_counts[box + number] -= 1
+
+        bit = 1 << number
+        if not self._row_counts[row + number]:
+            self._row_used[self._row_of[i]] &= ~bit
+        if not self._column_counts[column + number]:
+            self._column_used[self._column_of[i]] &= ~bit
+        if not self._box_counts[box + number]:
+            self._box_used[self._box_of[i]] &= ~bit
+
+        cells, current = self._cells, self._current
+        for j in self._peers[i]:
+            if cells[current + j] == number:
+                self._peer_conflicts[j] -= 1
+                if not self._peer_conflicts[j]:
+                    self._conflicting.discard(j)
+        self._peer_conflicts[i] = 0
+        self._conflicting.discard(i)
+
+    def create_puzzle(
+        self,
+        clues: int | None = None,
+        solver: SolverBackend | None = None,
+        deadline: float | None = None,
+        cancel: CancelToken | None = None
+    ) -> None:
+        """Loads a new puzzle, by default one with a single empty cell"""
+
+        with STATS.timer("board.create_puzzle"):
+            self.load_puzzle(*self.find_puzzle(clues, solver, deadline, cancel))
+
+    def find_puzzle(
+        self,
+        clues: int | None = None,
+        solver: SolverBackend | None = None,
+        deadline: float | None = None,
+        cancel: CancelToken | None = None
+    ) -> tuple[tuple[tuple[int, ...], ...], list[list[int]]]:
+        """
+        Picks the (solution, puzzle) create_puzzle would load, without
+        touching the board, so it can run off the GUI thread. A generated
+        puzzle stops at the deadline or cancel token with GenerationError
+        """
+
+        cells = self._geometry.cells
+        if clues is None:
+            clues = cells - 1
+        if clues < min_clues(self.order):
+            raise ValueError(f"Puzzles of this size have at least {min_clues(self.order)} clues")
+        if clues > cells:
+            raise ValueError("The board does not have that many cells")
+
+        if self._bank is not None and self._bank.count(clues):
+            source = "bank"
+            pair = self._bank.random(clues)
+        elif self._pool is not None: # the pool uses its own solver backend
+            source = "pool"
+            pair = self._pool.take(clues)
+        else:
+            source = "generated"
+            pair = generate_puzzle(clues, solver, order=self.order, deadline=deadline, cancel=cancel)
+        if STATS.enabled:
+            STATS.count(f"board.create_puzzle.{source}")
+        return pair
+
+    def load_from_bank(self, k: int) -> None:
+        """Loads puzzle number k from the puzzle bank"""
+
+        if self._bank is None:
+            raise ValueError("The board has no puzzle bank")
+        self.load_puzzle(*self._bank.get(k))
+
+    def load_by_id(self, puzzle_id: PuzzleId) -> None:
+        """Loads the puzzle of an ID, fx the daily challenge or a replay"""
+
+        if self.order != 3:
+            raise ValueError("Puzzle IDs are 9x9 only")
+        if self._cache is not None:
+            solution, puzzle = self._cache.get(puzzle_id)
+        else:
+            solution, puzzle = generate_from_id(puzzle_id)
+        self.load_puzzle(solution, puzzle)
+        self.puzzle_id = puzzle_id
+
+    def load_puzzle(self, solution: tuple[tuple[int, ...], ...], puzzle: list[list[int]]) -> None:
+        puzzle_cells = bytes(value for row in puzzle for value in row)
+        solution_cells = bytes(value for row in solution for value in row)
+        if len(puzzle_cells) != self._current or len(solution_cells) != self._current:
+            raise ValueError(f"The board takes {self.size}x{self.size} puzzles")
+
+        self.puzzle_id = None
+        self._cells[:self._current] = solution_cells
+        self._cells[self._current:self._clue] = puzzle_cells
+        self._cells[self._clue:] = bytes(value != BoardValue.EMPTY_CELL for value in puzzle_cells)
+        self._reset_tracking()
+        self._journal = MoveJournal(self._numbers)
+        self._notify_all()
+
 
 class MainModel:
-    def __init__(self) -> None:
-        self._board_model: BoardModel = BoardModel()
+    def __init__(
+        self,
+        pool_size: int = 4,
+        bank: PuzzleBank | None = None,
+        generate: Callable[[int], tuple[tuple[tuple[int, ...], ...], list[list[int]]]] | None = None,
+        cache_directory: str | None = None
+    ) -> None:
+        # generate defaults to generate_puzzle, fx PuzzleClient.generate uses the puzzle service
+        self._puzzle_pool: PuzzlePool = PuzzlePool(generate or generate_puzzle, size=pool_size)
+        self._puzzle_pool.start()
+        self._puzzle_cache = PuzzleCache(generate_from_id, cache_directory)
+        self._board_model: BoardModel = BoardModel(self._puzzle_pool, bank, self._puzzle_cache)
+
+    @property
+    def puzzle_pool(self) -> PuzzlePool:
+        return self._puzzle_pool
+
+    @property
+    def puzzle_cache(self) -> PuzzleCache:
+        return self._puzzle_cache
 
     @property
     def board_model(self) -> BoardModel:
         return self._board_model
 
 
+def generate_puzzle(
+    clues: int,
+    solver: SolverBackend | None = None,
+    rng=random,
+    order: int = 3,
+    deadline: float | None = None,
+    cancel: CancelToken | None = None
+) -> tuple[tuple[tuple[int, ...], ...], list[list[int]]]:
+    """
+    Creates a new solution and a puzzle for it, returned as (solution, puzzle).
+    The solver defaults to the fastest one for the order. The deadline and
+    cancel token are those of PuzzleGenerator.create
+    """
+
+    solutions = _shared_solutions(order) if rng is random else SolutionGenerator(rng, order=order)
+    solution = solutions.create()
+    generator = PuzzleGenerator(solution, solver, rng=rng)
+    return solution, generator.create(clues, deadline=deadline, cancel=cancel)
+
+
+@functools.cache
+def _shared_solutions(order: int) -> "SolutionGenerator":
+    """
+    One generator per order for the global random state, so consecutive
+    puzzles share the seed fills. With an rng of its own, fx of a puzzle
+    ID, a puzzle gets a generator of its own and stays reproducible
+    """
+
+    return SolutionGenerator(order=order)
+
+
+def generate_from_id(
+    puzzle_id: PuzzleId,
+    solver: SolverBackend = BitmaskSolver
+) -> tuple[tuple[tuple[int, ...], ...], list[list[int]]]:
+    """The puzzle of an ID, which is always the same for the same ID"""
+
+    return generate_puzzle(puzzle_id.clues, solver, random.Random(puzzle_id.rng_seed))
+
+
+# solutions made from one seed grid. Each seed reaches ~1.2e12 grids
+# through the symmetry group, and a fill costs as much as ~30 transforms
+RESEED_EVERY = 100
+
+
 class SolutionGenerator:
-    def __init__(self) -> None:
-        self.rng = random
+    """
+    Makes random solutions by filling a seed grid with a randomized search
+    and applying a random element of the symmetry group (transposition,
+    band, stack, row and column permutations and relabeling) to it.
+    A new seed grid is filled every `reseed_every` solutions. Use 1 when
+    no two solutions may be equivalent, fx to dedup by solution
+    """
+
+    def __init__(self, rng=random, reseed_every: int = RESEED_EVERY, order: int = 3) -> None:
+        self.rng = rng # random or a random.Random, which makes the output reproducible
+        self._reseed_every = reseed_every
+        self._order = order
+        self._created = 0
+        self._seed: tuple[int, ...] = ()
 
     def create(self) -> tuple[tuple[int, ...], ...]:
         """
-        Returns a valid sudoku solution as a 1D tuple of 81 elements,
-        where each group of 9 represents a row.
+        Returns a valid sudoku solution as a tuple of rows,
+        9 of 9 numbers each for the usual order of 3
         """
 
-        n = [0, 1, 2]
+        if self._created % self._reseed_every == 0:
+            self._seed = tuple(fill_grid(self.rng, self._order))
+        self._created += 1
 
-        # Column groups are [ 0, 1, 2 | 3, 4, 5 | 6, 7, 8 ],
-        # column_order shuffles the order of the column within each group
-        # and the order of the groups
-        column_order = tuple(group * 3 + column
-            for group in self._shuffle(n)
-            for column in self._shuffle(n)
-        ) # Example: [ 2, 1, 0 | 7, 6, 8 | 4, 3, 5 ]
+        size = self._order * self._order
+        cells = random_transform(self.rng, self._order).apply(self._seed)
+        return tuple(cells[r * size:r * size + size] for r in range(size))
 
-        row_order = tuple(group * 3 + row
-            for group in self._shuffle(n)
-            for row in self._shuffle(n)
-        )
 
-        pattern = lambda r, c: (3 * (r % 3) + r // 3 + c) % 9
-        seed = self._shuffle(list(range(1, 10, 1)))
+# digging passes PuzzleGenerator.create makes before it gives up. Nearly
+# every pass reaches 24 clues on 9x9, and about one in 20 reaches 22
+MAX_PASSES = 1000
 
-        solution = tuple(
-            tuple(seed[pattern(r, c)] for c in column_order) for r in row_order
-        )
-        return solution
 
-    def _shuffle(self, numbers: list[int]) -> list[int]:
-        """
-        Shuffles the order of elements in a list. Only used for integers,
-        but would work with other types
-        """
+# clues below which a PuzzleGenerator with a parallel backend uses it. The
+# checks of the last removals before a sparse target are the long ones
+PARALLEL_BELOW = 28
+
+
+class GenerationError(Exception):
+    """
+    Raised when no pass of the puzzle generator reached its targets.
+    `best` is the puzzle with the fewest clues a pass got to, if any
+    """
 
-        return random.sample(numbers, len(numbers))
+    def __init__(self, message: str, best: list[list[int]] | None = None) -> None:
+        super().__init__(message)
+        self.best = best
+
+
+class GenerationCancelled(GenerationError):
+    """Raised when the CancelToken of a generation was cancelled"""
 
 
 class PuzzleGenerator:
-    def __init__(self, solution: tuple[tuple[int, ...], ...]) -> None:
+    def __init__(
+        self,
+        solution: tuple[tuple[int, ...], ...],
+        solver: SolverBackend | None = None,
+        symmetric: bool = False,
+        rng=random,
+        parallel: SolverBackend | None = None,
+        parallel_below: int = PARALLEL_BELOW
+    ) -> None:
         self._solution = solution
+        self._size = len(solution)
+        self._order = order_of(self._size)
+        self._solver = solver or default_solver(self._order)
+        self._symmetric = symmetric
+        self._rng = rng
+        # fx parallel_backend(pool), used instead of solver below parallel_below clues
+        self._parallel = parallel
+        self._parallel_below = parallel_below
+        self._is_sparse = False
+        self._reused: BitmaskSolver | None = None # solver kept for a whole pass, if it can be
+        self._deadline: float | None = None
+        self._cancel: CancelToken | None = None
+        self.attempts = 0 # digging passes used by the last call to create
+
+    def create(
+        self,
+        clues: int,
+        rating: tuple[int, int] | None = None,
+        max_passes: int = MAX_PASSES,
+        deadline: float | None = None,
+        cancel: CancelToken | None = None,
+        progress: Callable[[int, int], None] | None = None
+    ) -> list[list[int]]:
+        """
+        Digs holes in the solution one cell (or symmetric pair) at a time
+        and keeps a hole only if the puzzle still has exactly one solution.
+        A pass that gets stuck above `clues` starts over with a new order,
+        as does a puzzle whose score is outside the (lowest, highest) rating.
+        Raises GenerationError after `max_passes` passes or once
+        time.monotonic() reaches `deadline`, and GenerationCancelled when
+        `cancel` is cancelled, both within a removal. progress(passes,
+        fewest clues so far) is called after every pass
+        """
+
+        cells = self._size * self._size
+        if not 0 <= clues <= cells:
+            raise ValueError(f"A {self._size}x{self._size} puzzle has 0 to {cells} clues")
+
+        self._deadline, self._cancel = deadline, cancel
+        self.attempts = 0
+        best: list[list[int]] | None = None # every dug board is a puzzle, just with more clues
+        fewest = cells + 1
+        dug = 0 # passes that reached the clue count, but not the rating
+        while self.attempts < max_passes:
+            self.attempts += 1
+            start = time.perf_counter() if STATS.enabled else 0.0
+            board = [list(row) for row in self._solution]
+            remaining = self._dig(board, clues)
+            is_done = remaining == clues and self._is_rated(board, rating)
+            dug += remaining == clues and not is_done
+            if STATS.enabled:
+                STATS.record("generator.attempt", time.perf_counter() - start)
+            if is_done:
+                if STATS.enabled:
+                    STATS.count("generator.puzzles")
+                    STATS.count("generator.attempts", self.attempts)
+                return board
+
+            if remaining < fewest:
+                best, fewest = board, remaining
+            if progress is not None:
+                progress(self.attempts, fewest)
+            if cancel is not None and cancel.is_cancelled:
+                raise GenerationCancelled(f"Cancelled after {self.attempts} passes", best)
+            if self._is_late():
+                raise GenerationError(
+                    f"No puzzle with {clues} clues before the deadline, the fewest were {fewest}", best
+                )
+
+        if rating is not None and dug:
+            raise GenerationError(
+                f"None of the {dug} puzzles with {clues} clues was rated {rating[0]} to {rating[1]}",
+                best
+            )
+        raise GenerationError(f"No pass got down to {clues} clues in {max_passes} passes", best)
+
+    def _is_late(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _is_stopped(self) -> bool:
+        """True if the pass has to end now, because of the deadline or the cancel token"""
+
+        return self._is_late() or self._cancel is not None and self._cancel.is_cancelled
+
+    def _is_rated(self, board: list[list[int]], rating: tuple[int, int] | None) -> bool:
+        if rating is None:
+            return True
+        score, _, solved = rate(board)
+        return solved and rating[0] <= score <= rating[1]
+
+    def _dig(self, board: list[list[int]], clues: int) -> int:
+        """Empties cells of the board in place and returns the number of clues left"""
+
+        size = self._size
+        # a solver that can change single cells follows the board for the whole pass
+        self._reused = self._solver(board) if hasattr(self._solver, "set_cell") else None
+
+        remaining = size * size
+        for group in self._removal_order(clues):
+            if remaining == clues or self._is_stopped():
+                break
+            if remaining - len(group) < clues:
+                group = group[:1] # only one clue left to remove
+
+            for i in group:
+                self._set(board, i, BoardValue.EMPTY_CELL)
+            self._is_sparse = self._parallel is not None and remaining - len(group) < self._parallel_below
+            if self._has_unique_solution(board, group):
+                remaining -= len(group)
+            else:
+                for i in group:
+                    self._set(board, i, self._solution[i // size][i % size])
+        self._reused = None
+        return remaining
+
+    def _set(self, board: list[list[int]], i: int, value: int) -> bool:
+        """Sets cell i on the board and the reused solver, unless value clashes with its peers"""
+
+        if self._reused is not None and not self._reused.set_cell(i, value):
+            return False
+        board[i // self._size][i % self._size] = value
+        return True
 
-    def create(self, clues: int) -> list[list[int]]:
-        while True:
-            board = [ [BoardValue.EMPTY_CELL] * 9 for _ in range(9)] # empty 9x9
-            self._fill_cells(board, clues)
-            board_copy = deepcopy(board)
+    def _removal_order(self, clues: int) -> list[tuple[int, ...]]:
+        """Random order of cells to remove, paired with their mirror cell if symmetric"""
 
-            if SudokuSolver(board).solve_multiple() == 1:
-                return board_copy
+        cells = self._size * self._size
+        if not self._symmetric:
+            return [(i,) for i in self._rng.sample(range(cells), cells)]
 
-    def _fill_cells(self, board: list[list[int]], fill_count: int = 0) -> None:
-        """Fill internal board with clues, by sampling indexes and setting cell at the index equal to the given solution"""
-        all_cells = 81
-        fill_count = min(all_cells, fill_count)
+        # the center of an odd board is its own mirror, so it decides
+        # if an odd number of cells is removed
+        half = cells // 2
+        center = [(half,)] if cells % 2 and (cells - clues) % 2 else []
+        return center + [(i, cells - 1 - i) for i in self._rng.sample(range(half), half)]
 
-        for i in random.sample(range(all_cells), fill_count):
-            board[i // 9][i % 9] = self._solution[i // 9][i % 9]
+    def _has_unique_solution(self, board: list[list[int]], removed: tuple[int, ...]) -> bool:
+        """
+        The board was unique before `removed` were emptied, so any other
+        solution must use a different digit in one of them. Searching only
+        for those is much cheaper than counting solutions from scratch
+        """
+
+        size = self._size
+        is_unique = True
+        for n, i in enumerate(removed):
+            y, x = i // size, i % size
+            for j in removed[:n]: # fixed, so no solution is found twice
+                self._set(board, j, self._solution[j // size][j % size])
+
+            # the reused solver turns down the digits that clash itself
+            digits = range(1, size + 1) if self._reused is not None else self._candidates(board, y, x)
+            for digit in digits:
+                if digit == self._solution[y][x] or not self._set(board, i, digit):
+                    continue
+                try:
+                    if self._is_sparse:
+                        solver = self._parallel(board)
+                    else:
+                        solver = self._reused or self._solver(board)
+                    is_unique = not solver.solve_multiple(limit=1)
+                except SearchLimitError: # not proven, so the clue stays
+                    is_unique = False
+                self._set(board, i, BoardValue.EMPTY_CELL)
+                if not is_unique:
+                    break
+
+            for j in removed[:n]:
+                self._set(board, j, BoardValue.EMPTY_CELL)
+            if not is_unique:
+                break
+        return is_unique
+
+    def _candidates(self, board: list[list[int]], y: int, x: int) -> set[int]:
+        """Digits that do not clash with the row, column and box of (x, y)"""
+
+        order, size = self._order, self._size
+        y0, x0 = (y // order) * order, (x // order) * order
+        used = set(board[y])
+        used.update(board[i][x] for i in range(size))
+        used.update(board[y0 + r][x0 + c] for r in range(order) for c in range(order))
+        return set(range(1, size + 1)) - used
 
 
 class SudokuSolver:
+    """
+    Reference solver that scans the row, column and box for every candidate.
+    Superseded by BitmaskSolver, but kept for cross-checking results
+    """
+
     def __init__(self, board: list[list[int]]) -> None:
         self.board = board
-        self.empty_cells = self._get_empty_cells()
+        self.solution: list[list[int]] | None = None
+        self._size = len(board)
+        self._order = order_of(self._size)
+        self.nodes = 0
+        self.backtracks = 0 # nodes whose subtree held no solution
+        self._is_consistent = self._check_clues()
+        self.empty_cells = self._get_empty_cells() if self._is_consistent else []
+
+    def solve_multiple(self, limit: int | None = None) -> int:
+        if not self._is_consistent:
+            return 0
+        counter = self._solve(limit)
+        if STATS.enabled:
+            record_solve(self)
+        return counter
 
-    def solve_multiple(self) -> int:
+    def _solve(self, limit: int | None) -> int:
+        self.nodes += 1
         if self.empty_cells == []:
+            if self.solution is None:
+                self.solution = [row[:] for row in self.board]
             return 1
 
         counter = 0
         x, y = self.empty_cells.pop(0)
-        for num in range(1, 10, 1):
+        for num in range(1, self._size + 1):
+            if limit is not None and counter >= limit:
+                break
             if self._is_valid(num, y, x):
                 self.board[y][x] = num
-                counter += self.solve_multiple()
-                if self.empty_cells != []:
-                    self.board[y][x] = BoardValue.EMPTY_CELL
-                    self.empty_cells.insert(0, (x, y) )
+                counter += self._solve(
+                    None if limit is None else limit - counter
+                )
+                self.board[y][x] = BoardValue.EMPTY_CELL
+        if counter == 0:
+            self.backtracks += 1
+        self.empty_cells.insert(0, (x, y) )
         return counter
 
     def _get_empty_cells(self) -> list[tuple[int, int]]:
         empty_cells = [
-            (x, y) for x in range(9) for y in range(9)
+            (x, y) for x in range(self._size) for y in range(self._size)
             if self.board[y][x] == BoardValue.EMPTY_CELL
         ]
 
         return empty_cells
 
+    def _check_clues(self) -> bool:
+        """False if a row has the wrong length, or a clue is out of range or clashes"""
+
+        if any(len(row) != self._size for row in self.board):
+            return False
+        for y, row in enumerate(self.board):
+            for x, num in enumerate(row):
+                if num == BoardValue.EMPTY_CELL:
+                    continue
+                if not 0 < num <= self._size:
+                    return False
+                row[x] = BoardValue.EMPTY_CELL
+                is_valid = self._is_valid(num, y, x)
+                row[x] = num
+                if not is_valid:
+                    return False
+        return True
+
     def _is_valid(self, num: int, y: int, x: int) -> bool:
         """Check if num is a valid number for the row, column and box"""
 
         # Check row and column
         if num in self.board[y]:
             return False
-        if num in (self.board[i][x] for i in range(9)):
+        if num in (self.board[i][x] for i in range(self._size)):
             return False
 
-        # Check 3x3 box
-        x0 = (y // 3) * 3
-        y0 = (x // 3) * 3
-        if num in (self.board[x0+c][y0+r] for c in range(3) for r in range(3)):
+        # Check box
+        order = self._order
+        x0 = (y // order) * order
+        y0 = (x // order) * order
+        if num in (self.board[x0+c][y0+r] for c in range(order) for r in range(order)):
             return False
 
         return True
+
+
+SOLVER_BACKENDS: dict[str, SolverBackend] = {
+    "backtracking": SudokuSolver,
+    "bitmask": BitmaskSolver,
+    "dlx": DancingLinksSolver,
+    "propagating": PropagatingSolver,
+}
+
+
+# nodes a uniqueness check may take on 16x16 and up before the clue is kept
+GENERATOR_MAX_NODES = 5
+
+# fewest clues of a puzzle by order. There is no 9x9 sudoku with fewer than
+# 17 (https://doi.org/10.48550/arXiv.1201.0749). From 16x16 up, the checks
+# that give up keep digging passes at ~92-102 clues on 16x16 and ~270-290
+# on 25x25, so these are counts nearly every pass gets down to
+MIN_CLUES = {3: 17, 4: 105, 5: 300}
+
+
+def min_clues(order: int) -> int:
+    """The fewest clues a puzzle of the order can be generated with"""
+
+    return MIN_CLUES.get(order, get_geometry(order).cells // 2)
+
+
+def default_solver(order: int = 3) -> SolverBackend:
+    """
+    The fastest backend for generating puzzles of an order. From 16x16 up
+    a search without propagation can take minutes, and the few checks that
+    would still take long give up and keep their clue instead
+    """
+
+    if order == 3:
+        return BitmaskSolver
+    return functools.partial(PropagatingSolver, max_nodes=GENERATOR_MAX_NODES)
+
+
+def get_solver(name: str) -> SolverBackend:
+    """Looks up a solver backend by name, fx from a config value or A/B flag"""
+
+    try:
+        return SOLVER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown solver backend: {name}") from None
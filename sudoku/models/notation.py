@@ -0,0 +1,25 @@
+EMPTY_CHARACTERS = ".0"
+
+
+def to_string(grid: tuple[tuple[int, ...], ...] | list[list[int]]) -> str:
+    """Writes a 9x9 grid as a line of 81 characters, with '.' for empty cells"""
+
+    return "".join(str(value) if value else "." for row in grid for value in row)
+
+
+def from_string(text: str) -> list[list[int]]:
+    """Reads a 9x9 grid from 81 characters, where '.' or '0' are empty cells"""
+
+    text = text.strip()
+    if len(text) != 81:
+        raise ValueError(f"Expected 81 cells, got {len(text)}")
+
+    cells = []
+    for character in text:
+        if character in EMPTY_CHARACTERS:
+            cells.append(0)
+        elif "1" <= character <= "9":
+            cells.append(int(character))
+        else:
+            raise ValueError(f"Invalid cell: {character!r}")
+    return [cells[r * 9:r * 9 + 9] for r in range(9)]
@@ -0,0 +1,187 @@
+"""
+Split-tree solution counting on a process pool, for the uniqueness checks
+of very sparse puzzles, where a single search can take seconds.
+
+The search tree is split at its first few branching cells (always the one
+with the fewest candidates, as BitmaskSolver does) and every subtree is
+searched by a worker. The workers share the number of solutions found, so
+once the limit is reached, fx 2 for a uniqueness check, all of them stop.
+"""
+
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from sudoku.models.solver import BitmaskSolver, SolverBackend, get_geometry, order_of
+
+
+# solutions found by all workers in the current count, set up by _init_worker
+_found = None
+
+
+def _init_worker(found) -> None:
+    global _found
+    _found = found
+
+
+class _SharedLimitSolver(BitmaskSolver):
+    """BitmaskSolver that adds its solutions to the shared count and stops once it reaches the limit"""
+
+    CHECK_EVERY = 256 # nodes between looks at the shared count
+
+    def __init__(self, board: list[list[int]]) -> None:
+        super().__init__(board)
+        self._countdown = self.CHECK_EVERY
+
+    def _search(self, remaining: int) -> bool:
+        if remaining == 0:
+            with _found.get_lock():
+                _found.value += 1
+                total = _found.value
+            return super()._search(0) or 0 < self._limit <= total
+
+        self._countdown -= 1
+        if not self._countdown:
+            self._countdown = self.CHECK_EVERY
+            if 0 < self._limit <= _found.value:
+                return True
+        return super()._search(remaining)
+
+
+def _search_subtree(cells: list[int], size: int, limit: int | None) -> tuple[int, list[int] | None]:
+    """Runs in a worker. Returns the solutions of a subtree (up to limit) and the first one"""
+
+    if limit is not None and _found.value >= limit: # the others have already found enough
+        return 0, None
+    solver = _SharedLimitSolver([cells[r * size:r * size + size] for r in range(size)])
+    count = solver.solve_multiple(limit)
+    solution = [value for row in solver.solution for value in row] if solver.solution else None
+    return count, solution
+
+
+def split(board: list[list[int]], subtrees: int, max_depth: int = 4) -> list[list[int]]:
+    """
+    The cells of the boards left after filling in the first branching
+    cells, one level at a time until there are at least `subtrees` of
+    them or `max_depth` levels branched. Cells with a single candidate are
+    filled in without counting as a level, and branches that clash are left out
+    """
+
+    size = len(board)
+    geometry = get_geometry(order_of(size))
+    row_of, column_of, box_of = geometry.row_of, geometry.column_of, geometry.box_of
+    frontier = [[value for row in board for value in row]]
+
+    depth = 0
+    while len(frontier) < subtrees and depth < max_depth:
+        is_split = is_branched = False
+        deeper = []
+        for cells in frontier:
+            rows, columns, boxes = [0] * size, [0] * size, [0] * size
+            for i, value in enumerate(cells):
+                if value:
+                    bit = 1 << value
+                    rows[row_of[i]] |= bit
+                    columns[column_of[i]] |= bit
+                    boxes[box_of[i]] |= bit
+
+            best, best_candidates = -1, 0
+            for i, value in enumerate(cells):
+                if not value:
+                    candidates = geometry.all_digits & ~(
+                        rows[row_of[i]] | columns[column_of[i]] | boxes[box_of[i]]
+                    )
+                    if best < 0 or candidates.bit_count() < best_candidates.bit_count():
+                        best, best_candidates = i, candidates
+            if best < 0: # already full
+                deeper.append(cells)
+                continue
+
+            is_split = True
+            is_branched |= best_candidates.bit_count() > 1
+            while best_candidates:
+                bit = best_candidates & -best_candidates
+                best_candidates ^= bit
+                branch = cells[:]
+                branch[best] = bit.bit_length() - 1
+                deeper.append(branch)
+        frontier = deeper
+        if not is_split:
+            break
+        depth += is_branched
+    return frontier
+
+
+class SplitPool:
+    """
+    Process pool for ParallelSolver. One count runs at a time, since all
+    workers share the number of solutions found in it
+    """
+
+    def __init__(self, workers: int | None = None) -> None:
+        # not forked, since forking a process with threads can deadlock
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.workers = workers or os.cpu_count() or 1
+        self._found = context.Value("i", 0)
+        self._executor = ProcessPoolExecutor(self.workers, context, _init_worker, (self._found,))
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "SplitPool":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+    def count(self, board: list[list[int]], limit: int | None) -> tuple[int, list[int] | None]:
+        """The solutions of a board (up to limit) and the cells of the first one"""
+
+        size = len(board)
+        with self._lock:
+            self._found.value = 0
+            futures = [
+                self._executor.submit(_search_subtree, cells, size, limit)
+                for cells in split(board, 4 * self.workers)
+            ]
+            results = [future.result() for future in futures]
+
+        count = sum(count for count, _ in results)
+        solution = next((solution for _, solution in results if solution is not None), None)
+        return (count if limit is None else min(count, limit)), solution
+
+
+class ParallelSolver:
+    """
+    Solver backend that counts the solutions of a board on a SplitPool.
+    It only pays off when a single search takes long, fx near the 17 clue
+    floor, as every count has a round trip to the workers
+    """
+
+    nodes = 0 # counted in the workers, not here
+    backtracks = 0
+
+    def __init__(self, board: list[list[int]], pool: SplitPool) -> None:
+        self.board = board
+        self.solution: list[list[int]] | None = None
+        self._pool = pool
+        self._is_consistent = BitmaskSolver(board)._is_consistent
+
+    def solve_multiple(self, limit: int | None = None) -> int:
+        if not self._is_consistent:
+            return 0
+        count, cells = self._pool.count(self.board, limit)
+        if cells is not None:
+            size = len(self.board)
+            self.solution = [cells[r * size:r * size + size] for r in range(size)]
+        return count
+
+
+def parallel_backend(pool: SplitPool) -> SolverBackend:
+    """A backend for PuzzleGenerator and the other users of solvers, searching on the pool"""
+
+    return functools.partial(ParallelSolver, pool=pool)
@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+from typing import Callable
+
+
+Solution = tuple[tuple[int, ...], ...]
+Puzzle = list[list[int]]
+
+
+class PuzzlePool:
+    """
+    Keeps `size` ready puzzles for every clue count that has been asked for,
+    refilled in the background by worker threads
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[int], tuple[Solution, Puzzle]],
+        size: int = 4,
+        workers: int = 1
+    ) -> None:
+        self._generate = generate # makes a (solution, puzzle) pair with the given clues
+        self._size = size
+        self._workers = workers
+
+        self._puzzles: dict[int, deque[tuple[Solution, Puzzle]]] = {}
+        self._pending: dict[int, int] = {} # puzzles being generated right now
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._is_running = False
+
+        self.hits = 0
+        self.misses = 0
+
+    def start(self) -> None:
+        with self._condition:
+            if self._is_running:
+                return
+            self._is_running = True
+        self._threads = [
+            threading.Thread(target=self._refill, name=f"puzzle-pool-{i}", daemon=True)
+            for i in range(self._workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._is_running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def reserve(self, clues: int) -> None:
+        """Starts keeping puzzles with the given number of clues in the pool"""
+
+        with self._condition:
+            if clues not in self._puzzles:
+                self._puzzles[clues] = deque()
+                self._pending[clues] = 0
+                self._condition.notify_all()
+
+    def available(self, clues: int) -> int:
+        with self._condition:
+            return len(self._puzzles.get(clues, ()))
+
+    def take(self, clues: int) -> tuple[Solution, Puzzle]:
+        """Returns a ready puzzle, or generates one on the spot if there are none left"""
+
+        self.reserve(clues)
+        with self._condition:
+            puzzles = self._puzzles[clues]
+            if puzzles:
+                self.hits += 1
+                self._condition.notify() # wake a worker to replace it
+                return puzzles.popleft()
+            self.misses += 1
+        return self._generate(clues)
+
+    def _refill(self) -> None:
+        while True:
+            with self._condition:
+                clues = self._next_to_fill()
+                while self._is_running and clues is None:
+                    self._condition.wait()
+                    clues = self._next_to_fill()
+                if not self._is_running:
+                    return
+                assert clues is not None
+                self._pending[clues] += 1
+
+            puzzle = self._generate(clues)
+
+            with self._condition:
+                self._pending[clues] -= 1
+                self._puzzles[clues].append(puzzle)
+
+    def _next_to_fill(self) -> int | None:
+        """The clue count with the fewest ready puzzles, if any is below the pool size"""
+
+        clues, count = None, self._size
+        for key, puzzles in self._puzzles.items():
+            if len(puzzles) + self._pending[key] < count:
+                clues, count = key, len(puzzles) + self._pending[key]
+        return clues
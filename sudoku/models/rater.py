@@ -0,0 +1,322 @@
+from enum import Enum
+from typing import NamedTuple
+
+from sudoku.models.solver import BOX_OF, COLUMN_OF, PEERS, ROW_OF, UNITS, Mask
+
+
+class Technique(Enum):
+    """Human solving techniques, from the easiest to the hardest"""
+    NAKED_SINGLE   = "Naked single"
+    HIDDEN_SINGLE  = "Hidden single"
+    NAKED_PAIR     = "Naked pair"
+    HIDDEN_PAIR    = "Hidden pair"
+    POINTING       = "Pointing"
+    BOX_LINE       = "Box/line reduction"
+    X_WING         = "X-wing"
+
+    @property
+    def weight(self) -> int:
+        """How much a single use of the technique adds to the score"""
+
+        weight = 1
+        match self:
+            case Technique.NAKED_SINGLE:
+                weight = 1
+            case Technique.HIDDEN_SINGLE:
+                weight = 2
+            case Technique.NAKED_PAIR:
+                weight = 10
+            case Technique.HIDDEN_PAIR:
+                weight = 15
+            case Technique.POINTING:
+                weight = 20
+            case Technique.BOX_LINE:
+                weight = 25
+            case Technique.X_WING:
+                weight = 50
+        return weight
+
+
+class Rating(NamedTuple):
+    score: int # sum of the weights of every step, higher is harder
+    hardest: Technique | None
+    solved: bool # False if the techniques were not enough to solve the puzzle
+
+
+class Contradiction(Exception):
+    """Raised when a cell is left without candidates"""
+
+
+# the 9 digits as (digit, bit) pairs
+DIGIT_BITS = tuple((digit, 1 << digit) for digit in range(1, 10))
+
+
+class LogicalSolver:
+    """
+    Solves a 9x9 puzzle the way a person would, using only the techniques
+    in Technique and always trying the easiest one first
+    """
+
+    def __init__(self, board: list[list[int]]) -> None:
+        self.board = board
+        self._cells = [value for row in board for value in row]
+        self._masks = [Mask.ALL_DIGITS] * 81 # candidates, 0 once a cell is filled
+        self._singles: list[int] = [] # cells that might be down to one candidate
+        self._remaining = 81
+        self._score = 0
+        self._hardest: Technique | None = None
+
+        self._is_consistent = True
+        try:
+            for i, value in enumerate(self._cells):
+                if value:
+                    self._assign(i, value)
+        except Contradiction:
+            self._is_consistent = False
+
+    @property
+    def cells(self) -> list[int]:
+        """The 81 cells as far as they have been solved"""
+
+        return self._cells
+
+    def rate(self) -> Rating:
+        if not self._is_consistent:
+            return Rating(self._score, self._hardest, False)
+
+        try:
+            while self._remaining:
+                if not self._step():
+                    return Rating(self._score, self._hardest, False)
+        except Contradiction:
+            return Rating(self._score, self._hardest, False)
+        return Rating(self._score, self._hardest, True)
+
+    def next_placements(self) -> dict[int, tuple[int, Technique]]:
+        """
+        Applies the techniques only until cells get their digits, and
+        returns those cells with their digit and the hardest technique it
+        took to place them. Empty if the techniques get stuck first
+        """
+
+        if not self._is_consistent:
+            return {}
+        empty = [i for i, value in enumerate(self._cells) if not value]
+        remaining = self._remaining
+        try:
+            while self._remaining == remaining:
+                if not self._step():
+                    return {}
+        except Contradiction:
+            return {}
+        hardest = self._hardest or Technique.NAKED_SINGLE
+        return {i: (self._cells[i], hardest) for i in empty if self._cells[i]}
+
+    def _step(self) -> bool:
+        """Uses the easiest technique that gets anywhere. False if none does"""
+
+        techniques = (
+            (self._naked_single, Technique.NAKED_SINGLE),
+            (self._hidden_single, Technique.HIDDEN_SINGLE),
+            (self._naked_pair, Technique.NAKED_PAIR),
+            (self._hidden_pair, Technique.HIDDEN_PAIR),
+            (self._pointing, Technique.POINTING),
+            (self._box_line, Technique.BOX_LINE),
+            (self._x_wing, Technique.X_WING),
+        )
+        for step, technique in techniques:
+            uses = step()
+            if uses:
+                self._use(technique, uses)
+                return True
+        return False
+
+    def _use(self, technique: Technique, uses: int) -> None:
+        self._score += technique.weight * uses
+        if self._hardest is None or technique.weight > self._hardest.weight:
+            self._hardest = technique
+
+    def _assign(self, i: int, digit: int) -> None:
+        bit = 1 << digit
+        if self._cells[i] == 0 and not self._masks[i] & bit:
+            raise Contradiction
+        self._cells[i] = digit
+        self._masks[i] = 0
+        self._remaining -= 1
+
+        # same as calling _eliminate on every peer, inlined as this is the hot path
+        cells, masks, singles = self._cells, self._masks, self._singles
+        for j in PEERS[i]:
+            mask = masks[j]
+            if mask & bit:
+                mask ^= bit
+                if not mask:
+                    raise Contradiction
+                masks[j] = mask
+                if not mask & (mask - 1):
+                    singles.append(j)
+            elif cells[j] == digit:
+                raise Contradiction
+
+    def _eliminate(self, i: int, bits: int) -> bool:
+        """Removes candidates from a cell. Returns True if any were removed"""
+
+        mask = self._masks[i]
+        if not mask & bits:
+            return False
+        mask &= ~bits
+        if not mask:
+            raise Contradiction
+        self._masks[i] = mask
+        if not mask & (mask - 1):
+            self._singles.append(i)
+        return True
+
+    # every step returns how many times its technique was used
+
+    def _naked_single(self) -> int:
+        uses = 0
+        masks, singles = self._masks, self._singles
+        while singles:
+            i = singles.pop()
+            mask = masks[i]
+            if mask and not mask & (mask - 1):
+                self._assign(i, mask.bit_length() - 1)
+                uses += 1
+        return uses
+
+    def _hidden_single(self) -> int:
+        uses = 0
+        masks = self._masks
+        for unit in UNITS:
+            once = twice = 0
+            for i in unit:
+                twice |= once & masks[i]
+                once |= masks[i]
+            hidden = once & ~twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if masks[i] & bit: # may be gone after the previous assignment
+                        self._assign(i, bit.bit_length() - 1)
+                        uses += 1
+                        break
+        return uses
+
+    def _naked_pair(self) -> int:
+        masks = self._masks
+        for unit in UNITS:
+            pairs: dict[int, int] = {}
+            for i in unit:
+                mask = masks[i]
+                if mask.bit_count() != 2:
+                    continue
+                if mask in pairs:
+                    first = pairs[mask]
+                    changed = False
+                    for j in unit:
+                        if j != i and j != first:
+                            changed |= self._eliminate(j, mask)
+                    if changed:
+                        return 1
+                else:
+                    pairs[mask] = i
+        return 0
+
+    def _hidden_pair(self) -> int:
+        masks = self._masks
+        for unit in UNITS:
+            # the cells (as a bitmask over the unit) where every digit can go
+            where = dict.fromkeys((bit for _, bit in DIGIT_BITS), 0)
+            for n, i in enumerate(unit):
+                mask = masks[i]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    where[bit] |= 1 << n
+
+            places: dict[int, list[int]] = {}
+            for bit, cells in where.items():
+                if cells.bit_count() == 2:
+                    places.setdefault(cells, []).append(bit)
+
+            for where_pair, bits in places.items():
+                if len(bits) != 2:
+                    continue
+                pair = bits[0] | bits[1]
+                changed = False
+                for n, i in enumerate(unit):
+                    if where_pair >> n & 1:
+                        changed |= self._eliminate(i, masks[i] & ~pair)
+                if changed:
+                    return 1
+        return 0
+
+    def _pointing(self) -> int:
+        """A digit confined to one row or column within a box can go nowhere else on that line"""
+
+        masks = self._masks
+        for box in UNITS[18:]:
+            for digit, bit in DIGIT_BITS:
+                cells = [i for i in box if masks[i] & bit]
+                if len(cells) < 2:
+                    continue
+                for of, offset in ((ROW_OF, 0), (COLUMN_OF, 9)):
+                    line = of[cells[0]]
+                    if all(of[i] == line for i in cells[1:]):
+                        changed = False
+                        for j in UNITS[offset + line]:
+                            if BOX_OF[j] != BOX_OF[cells[0]]:
+                                changed |= self._eliminate(j, bit)
+                        if changed:
+                            return 1
+        return 0
+
+    def _box_line(self) -> int:
+        """A digit confined to one box within a line can go nowhere else in that box"""
+
+        masks = self._masks
+        for line in UNITS[:18]:
+            for digit, bit in DIGIT_BITS:
+                cells = [i for i in line if masks[i] & bit]
+                if len(cells) < 2:
+                    continue
+                box = BOX_OF[cells[0]]
+                if all(BOX_OF[i] == box for i in cells[1:]):
+                    changed = False
+                    for j in UNITS[18 + box]:
+                        if j not in line:
+                            changed |= self._eliminate(j, bit)
+                    if changed:
+                        return 1
+        return 0
+
+    def _x_wing(self) -> int:
+        masks = self._masks
+        for lines, crosses in ((UNITS[:9], UNITS[9:18]), (UNITS[9:18], UNITS[:9])):
+            for digit, bit in DIGIT_BITS:
+                # lines where the digit has exactly two places, by those places
+                seen: dict[tuple[int, int], int] = {}
+                for n, line in enumerate(lines):
+                    places = tuple(k for k, i in enumerate(line) if masks[i] & bit)
+                    if len(places) != 2:
+                        continue
+                    if places in seen:
+                        other = seen[places]
+                        changed = False
+                        for k in places:
+                            for m, j in enumerate(crosses[k]):
+                                if m != n and m != other:
+                                    changed |= self._eliminate(j, bit)
+                        if changed:
+                            return 1
+                    else:
+                        seen[places] = n
+        return 0
+
+
+def rate(board: list[list[int]]) -> Rating:
+    """Rates how hard a puzzle is to solve by hand"""
+
+    return LogicalSolver(board).rate()
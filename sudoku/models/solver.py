@@ -0,0 +1,490 @@
+import functools
+import math
+import random
+from typing import Callable, Protocol
+
+from sudoku.stats import STATS
+
+
+class Solver(Protocol):
+    """Interface shared by the solver backends"""
+
+    solution: list[list[int]] | None
+    nodes: int
+    backtracks: int
+
+    def solve_multiple(self, limit: int | None = None) -> int: ...
+
+
+# a backend is anything that builds a Solver from a board, usually the class itself
+SolverBackend = Callable[[list[list[int]]], Solver]
+
+
+def count_nodes(solver) -> None:
+    """
+    Shadows the recursive `_search` of a solver with a wrapper that counts
+    nodes, and backtracks as the nodes whose subtree held no solution.
+    Only done while stats are enabled, so the plain search pays nothing
+    """
+
+    search = type(solver)._search
+
+    def counted_search(*args) -> bool:
+        found = solver._found
+        solver.nodes += 1
+        is_done = search(solver, *args)
+        if solver._found == found:
+            solver.backtracks += 1
+        return is_done
+
+    solver._search = counted_search
+
+
+def record_solve(solver: Solver) -> None:
+    """Adds the node counts of a finished solve to the stats"""
+
+    STATS.count("solver.solves")
+    STATS.count("solver.nodes", solver.nodes)
+    STATS.count("solver.backtracks", solver.backtracks)
+
+
+class Mask: # constants
+    ALL_DIGITS = 0b1111111110 # bit n is set when digit n (1-9) is possible
+
+
+class Geometry:
+    """
+    Lookup tables of a board whose boxes have `order` x `order` cells, so
+    it has order^2 rows, columns, boxes and digits (9 for the usual 3)
+    """
+
+    def __init__(self, order: int) -> None:
+        if order < 1:
+            raise ValueError("The box order has to be at least 1")
+        size = order * order
+        cells = size * size
+        self.order = order
+        self.size = size # digits, and cells in every row, column and box
+        self.cells = cells
+        self.all_digits = ((1 << size) - 1) << 1 # bit n is set when digit n is possible
+
+        # from a cell index to its row, column and box
+        self.row_of = tuple(i // size for i in range(cells))
+        self.column_of = tuple(i % size for i in range(cells))
+        self.box_of = tuple((i // (size * order)) * order + (i % size) // order for i in range(cells))
+
+        # cell indexes of the rows, columns and boxes, in that order
+        units: list[list[int]] = [[] for _ in range(3 * size)]
+        for i in range(cells):
+            units[self.row_of[i]].append(i)
+            units[size + self.column_of[i]].append(i)
+            units[2 * size + self.box_of[i]].append(i)
+        self.units = tuple(tuple(unit) for unit in units)
+
+        # indexes of the cells sharing a row, column or box with each cell
+        self.peers = tuple(
+            tuple(sorted({
+                *self.units[self.row_of[i]], *self.units[size + self.column_of[i]],
+                *self.units[2 * size + self.box_of[i]]
+            } - {i}))
+            for i in range(cells)
+        )
+
+
+@functools.cache
+def get_geometry(order: int) -> Geometry:
+    """The tables of an order, built once"""
+
+    return Geometry(order)
+
+
+def order_of(size: int) -> int:
+    """The box order of a board with `size` rows, fx 3 for 9"""
+
+    order = math.isqrt(size)
+    if order < 1 or order * order != size:
+        raise ValueError(f"A board of {size} rows has no square boxes")
+    return order
+
+
+# the tables of the usual 9x9 board, which most of the package is made for
+ROW_OF = get_geometry(3).row_of
+COLUMN_OF = get_geometry(3).column_of
+BOX_OF = get_geometry(3).box_of
+UNITS = get_geometry(3).units # the 9 rows, 9 columns and 9 boxes
+PEERS = get_geometry(3).peers # the 20 peers of every cell
+
+
+class BitmaskSolver:
+    """
+    Backtracking solver that keeps a bitmask of used digits for every row,
+    column and box, and always branches on the cell with the fewest candidates.
+    Works on boards of any box order, taken from the number of rows
+    """
+
+    nodes = 0 # search calls, only counted while stats are enabled
+    backtracks = 0
+
+    def __init__(self, board: list[list[int]]) -> None:
+        self.board = board
+        self.solution: list[list[int]] | None = None
+
+        geometry = get_geometry(order_of(len(board)))
+        self._size = geometry.size
+        self._all_digits = geometry.all_digits
+        self._row_of, self._column_of, self._box_of = geometry.row_of, geometry.column_of, geometry.box_of
+
+        self._cells = [value for row in board for value in row]
+        self._rows = [0] * geometry.size
+        self._columns = [0] * geometry.size
+        self._boxes = [0] * geometry.size
+        self._is_consistent = len(self._cells) == geometry.cells
+
+        if self._is_consistent:
+            for i, value in enumerate(self._cells):
+                if value:
+                    self._is_consistent &= self._place(i, value)
+        self._empty_cells = [i for i, value in enumerate(self._cells) if not value]
+
+    def solve_multiple(self, limit: int | None = None) -> int:
+        """
+        Counts the solutions of the board, stopping as soon as `limit`
+        solutions are found. The first solution is stored in `self.solution`
+        """
+
+        if not self._is_consistent:
+            return 0
+        self._limit = limit if limit is not None else -1
+        self._found = 0
+        self.solution = None
+        is_counted = STATS.enabled
+        if is_counted:
+            self.nodes = self.backtracks = 0
+            count_nodes(self)
+        self._search(len(self._empty_cells))
+        if is_counted:
+            record_solve(self)
+        return self._found
+
+    def set_cell(self, i: int, value: int) -> bool:
+        """
+        Changes cell i between searches, so one solver can check many boards
+        that differ in a few cells, fx while digging a puzzle. Returns False,
+        and leaves the cell as it was, if value clashes with its peers
+        """
+
+        old = self._cells[i]
+        if old == value:
+            return True
+        if old:
+            bit = 1 << old
+            self._rows[self._row_of[i]] ^= bit
+            self._columns[self._column_of[i]] ^= bit
+            self._boxes[self._box_of[i]] ^= bit
+        if value and not self._place(i, value):
+            if old:
+                self._place(i, old)
+            return False
+
+        if not old:
+            self._empty_cells.remove(i)
+        elif not value:
+            self._empty_cells.append(i)
+        self._cells[i] = value
+        return True
+
+    def _place(self, i: int, value: int) -> bool:
+        """Marks value as used in the row, column and box of cell i"""
+
+        bit = 1 << value
+        row, column, box = self._row_of[i], self._column_of[i], self._box_of[i]
+        if (self._rows[row] | self._columns[column] | self._boxes[box]) & bit:
+            return False
+        self._rows[row] |= bit
+        self._columns[column] |= bit
+        self._boxes[box] |= bit
+        return True
+
+    def _search(self, remaining: int) -> bool:
+        """
+        Fills the first `remaining` entries of the empty cells.
+        Returns True when the solution limit has been reached
+        """
+
+        if remaining == 0:
+            self._found += 1
+            if self.solution is None:
+                size = self._size
+                self.solution = [self._cells[r * size:r * size + size] for r in range(size)]
+            return self._found == self._limit
+
+        rows, columns, boxes = self._rows, self._columns, self._boxes
+        row_of, column_of, box_of = self._row_of, self._column_of, self._box_of
+        all_digits = self._all_digits
+        empty_cells = self._empty_cells
+
+        # find the most constrained cell (MRV)
+        best_position, best_candidates, best_count = 0, 0, self._size + 1
+        for position in range(remaining):
+            i = empty_cells[position]
+            candidates = all_digits & ~(rows[row_of[i]] | columns[column_of[i]] | boxes[box_of[i]])
+            count = candidates.bit_count()
+            if count < best_count:
+                best_position, best_candidates, best_count = position, candidates, count
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return False
+
+        # move the chosen cell out of the unfilled part of the list
+        last = remaining - 1
+        i = empty_cells[best_position]
+        empty_cells[best_position] = empty_cells[last]
+        empty_cells[last] = i
+        row, column, box = row_of[i], column_of[i], box_of[i]
+
+        candidates = best_candidates
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+
+            rows[row] |= bit
+            columns[column] |= bit
+            boxes[box] |= bit
+            self._cells[i] = bit.bit_length() - 1
+
+            is_done = self._search(last)
+
+            rows[row] ^= bit
+            columns[column] ^= bit
+            boxes[box] ^= bit
+            if is_done:
+                self._cells[i] = 0
+                return True
+
+        self._cells[i] = 0
+        return False
+
+
+class SearchLimitError(Exception):
+    """Raised by a solver that was given `max_nodes` when the search needs more"""
+
+
+class PropagatingSolver:
+    """
+    Solver that keeps the candidates of every cell as a bitmask and fills in
+    naked and hidden singles after every guess, failing as soon as a cell or
+    a digit of a unit has no place left. The nodes cost more than those of
+    BitmaskSolver, but there are far fewer, which pays off on hard puzzles
+    and on 16x16 boards and up. With `max_nodes`, searches that need more
+    nodes raise SearchLimitError instead of running for a long time
+    """
+
+    nodes = 0 # only counted while stats are enabled
+    backtracks = 0
+
+    def __init__(self, board: list[list[int]], max_nodes: int | None = None) -> None:
+        self.board = board
+        self.solution: list[list[int]] | None = None
+        self._max_nodes = max_nodes
+
+        geometry = get_geometry(order_of(len(board)))
+        self._size = geometry.size
+        self._all_digits = geometry.all_digits
+        self._units = geometry.units
+        self._peers = geometry.peers
+
+        cells = [value for row in board for value in row]
+        self._masks = [geometry.all_digits] * geometry.cells
+        self._is_consistent = len(cells) == geometry.cells
+        if self._is_consistent:
+            for i, value in enumerate(cells):
+                if value and not (
+                    0 < value <= geometry.size and self._masks[i] >> value & 1
+                    and self._assign(self._masks, i, 1 << value)
+                ):
+                    self._is_consistent = False
+                    break
+
+    def solve_multiple(self, limit: int | None = None) -> int:
+        """
+        Counts the solutions of the board, stopping as soon as `limit`
+        solutions are found. The first solution is stored in `self.solution`
+        """
+
+        if not self._is_consistent:
+            return 0
+        self._limit = limit if limit is not None else -1
+        self._found = 0
+        self._budget = self._max_nodes if self._max_nodes is not None else math.inf
+        is_counted = STATS.enabled
+        if is_counted:
+            count_nodes(self)
+        self._search(self._masks[:])
+        if is_counted:
+            record_solve(self)
+        return self._found
+
+    def _assign(self, masks: list[int], i: int, bit: int) -> bool:
+        """Gives cell i the digit of bit and removes it from the peers, and so on for new singles"""
+
+        peers = self._peers
+        masks[i] = bit
+        stack = [i]
+        while stack:
+            i = stack.pop()
+            bit = masks[i]
+            for j in peers[i]:
+                mask = masks[j]
+                if mask & bit:
+                    mask ^= bit
+                    masks[j] = mask
+                    if not mask:
+                        return False
+                    if not mask & (mask - 1):
+                        stack.append(j)
+        return True
+
+    def _propagate(self, masks: list[int]) -> bool:
+        """Places hidden singles until there are none. False on a contradiction"""
+
+        all_digits = self._all_digits
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            for unit in self._units:
+                once = twice = 0
+                for i in unit:
+                    mask = masks[i]
+                    twice |= once & mask
+                    once |= mask
+                if once != all_digits: # a digit with no place in the unit
+                    return False
+                hidden = once & ~twice
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for i in unit:
+                        if masks[i] & bit:
+                            break
+                    else: # taken by a single placed just before
+                        return False
+                    if masks[i] != bit:
+                        if not self._assign(masks, i, bit):
+                            return False
+                        is_changed = True
+        return True
+
+    def _search(self, masks: list[int]) -> bool:
+        """Returns True when the solution limit has been reached"""
+
+        self._budget -= 1
+        if self._budget < 0:
+            raise SearchLimitError(f"The search needs more than {self._max_nodes} nodes")
+        if not self._propagate(masks):
+            return False
+
+        # the unsolved cell with the fewest candidates
+        best, best_count = -1, self._size + 1
+        for i, mask in enumerate(masks):
+            if mask & (mask - 1):
+                count = mask.bit_count()
+                if count < best_count:
+                    best, best_count = i, count
+                    if count == 2:
+                        break
+
+        if best < 0:
+            self._found += 1
+            if self.solution is None:
+                size = self._size
+                values = [mask.bit_length() - 1 for mask in masks]
+                self.solution = [values[r * size:r * size + size] for r in range(size)]
+            return self._found == self._limit
+
+        candidates = masks[best]
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            child = masks[:]
+            if self._assign(child, best, bit) and self._search(child):
+                return True
+        return False
+
+
+def fill_grid(rng=random, order: int = 3) -> list[int]:
+    """
+    A random full grid as order^4 values (81 for 9x9), made by the same MRV
+    search as BitmaskSolver on an empty board, trying candidates in random
+    order. Not exactly uniform over all grids, but any grid can come out
+    """
+
+    geometry = get_geometry(order)
+    size, all_digits = geometry.size, geometry.all_digits
+    row_of, column_of, box_of = geometry.row_of, geometry.column_of, geometry.box_of
+    cells = [0] * geometry.cells
+    rows, columns, boxes = [0] * size, [0] * size, [0] * size
+
+    # the boxes on the diagonal share no row or column, so any digits will do
+    for box in range(0, size, order + 1):
+        for i, digit in zip(geometry.units[2 * size + box], rng.sample(range(1, size + 1), size)):
+            bit = 1 << digit
+            cells[i] = digit
+            rows[row_of[i]] |= bit
+            columns[column_of[i]] |= bit
+            boxes[box] |= bit
+    empty_cells = [i for i in range(geometry.cells) if not cells[i]]
+    rng.shuffle(empty_cells) # breaks the MRV ties randomly
+    budget: float = 0
+
+    def search(remaining: int) -> bool:
+        nonlocal budget
+        if remaining == 0:
+            return True
+
+        best_position, best_candidates, best_count = 0, 0, size + 1
+        for position in range(remaining):
+            i = empty_cells[position]
+            candidates = all_digits & ~(rows[row_of[i]] | columns[column_of[i]] | boxes[box_of[i]])
+            count = candidates.bit_count()
+            if count < best_count:
+                best_position, best_candidates, best_count = position, candidates, count
+                if count <= 1:
+                    break
+        if best_count == 0:
+            budget -= 1
+            return False
+
+        last = remaining - 1
+        i = empty_cells[best_position]
+        empty_cells[best_position] = empty_cells[last]
+        empty_cells[last] = i
+        row, column, box = row_of[i], column_of[i], box_of[i]
+
+        digits = [digit for digit in range(1, size + 1) if best_candidates >> digit & 1]
+        if best_count > 1:
+            rng.shuffle(digits)
+        for digit in digits:
+            bit = 1 << digit
+            rows[row] |= bit
+            columns[column] |= bit
+            boxes[box] |= bit
+            cells[i] = digit
+            if search(last):
+                return True
+            rows[row] ^= bit
+            columns[column] ^= bit
+            boxes[box] ^= bit
+            if budget < 0: # every caller undoes its move, so the grid is back to the start
+                break
+        cells[i] = 0
+        return False
+
+    # on 16x16 and up a search often gets stuck for a very long time on an
+    # early bad choice, so it starts over instead. 9x9 grids fill fast enough
+    # without, which also keeps the puzzles of puzzle IDs the same
+    while True:
+        budget = geometry.cells // 2 if order > 3 else math.inf # dead ends
+        if search(len(empty_cells)):
+            return cells
+        rng.shuffle(empty_cells)
@@ -0,0 +1,90 @@
+import itertools
+import random
+from typing import NamedTuple
+
+
+Cells = tuple[int, ...] # a grid as 81 values (or n^4 for other orders), row by row
+
+
+class Transform(NamedTuple):
+    """
+    An element of the sudoku symmetry group: cell i of the result takes the
+    digit of cell `cells[i]`, relabeled by `digits`. Every transform maps
+    a valid grid to a valid grid
+    """
+    cells: tuple[int, ...] # permutation of the cells
+    digits: tuple[int, ...] # digits[d] is the new label of digit d, with 0 kept as 0
+
+    def apply(self, grid: Cells) -> Cells:
+        digits = self.digits
+        return tuple([digits[grid[i]] for i in self.cells])
+
+
+IDENTITY = Transform(tuple(range(81)), tuple(range(10))) # of a 9x9 grid
+
+
+def line_order(bands: tuple[int, ...] | list[int], lines: list[tuple[int, ...]] | list[list[int]]) -> list[int]:
+    """
+    Rows (or columns) in the order given by a permutation of the bands
+    and a permutation of the lines inside every band (3 of each for 9x9)
+    """
+
+    order = len(bands)
+    return [band * order + line for band in bands for line in lines[band]]
+
+
+def make_transform(
+    rows: list[int], columns: list[int], transpose: bool, digits: tuple[int, ...]
+) -> Transform:
+    """
+    Row r of the result is row rows[r] of the grid, and likewise for
+    columns, after which the result is transposed if `transpose`
+    """
+
+    starts = [row * len(rows) for row in rows]
+    if transpose:
+        cells = [start + column for column in columns for start in starts]
+    else:
+        cells = [start + column for start in starts for column in columns]
+    return Transform(tuple(cells), digits)
+
+
+# the 6 orders of 3 bands, stacks or lines within one
+PERMUTATIONS = tuple(itertools.permutations(range(3)))
+
+# choices of a random transform besides the digits: transposition and 8 permutations of 3
+LAYOUTS = 2 * 6 ** 8
+
+
+def random_transform(rng=random, order: int = 3) -> Transform:
+    """
+    A uniformly random element of the group: transposition, band, stack,
+    row and column permutations and a relabeling of the digits
+    (2 * 6^8 * 9! transforms of a 9x9 grid in all)
+    """
+
+    if order != 3:
+        def permutation() -> list[int]:
+            return rng.sample(range(order), order)
+
+        digits = rng.sample(range(1, order * order + 1), order * order)
+        return make_transform(
+            line_order(permutation(), [permutation() for _ in range(order)]),
+            line_order(permutation(), [permutation() for _ in range(order)]),
+            rng.random() < 0.5, (0, *digits)
+        )
+
+    # one random number for the layout is much cheaper than 8 calls to rng.sample
+    k = rng.randrange(LAYOUTS)
+    transpose, k = k & 1, k >> 1
+    orders = []
+    for _ in range(8):
+        k, n = divmod(k, 6)
+        orders.append(PERMUTATIONS[n])
+
+    digits = list(range(1, 10))
+    rng.shuffle(digits)
+    return make_transform(
+        line_order(orders[0], orders[1:4]), line_order(orders[4], orders[5:8]),
+        bool(transpose), (0, *digits)
+    )
@@ -0,0 +1,342 @@
+"""
+Puzzle service: one warm process pool generating and solving 9x9 puzzles
+for many clients, over line-delimited JSON on TCP ("host:port") or a Unix socket
+(a path).
+
+Every request and response is one JSON object on one line. Responses carry
+the "id" of their request and can come back in a different order:
+
+    {"id": 1, "op": "generate", "clues": 36}
+    {"id": 1, "solution": "<81 digits>", "puzzle": "<81 cells, '.' when empty>"}
+
+    {"id": 2, "op": "generate", "difficulty": "expert"}
+
+    {"id": 3, "op": "solve", "puzzle": "<81 cells>", "limit": 2}
+    {"id": 3, "count": 1, "solution": "<81 digits or null>"}
+
+Generated puzzles have MIN_CLUES to 81 clues. Solving counts solutions up
+to "limit", which defaults to 2 (enough to tell if a puzzle is unique) and
+is capped at MAX_LIMIT, so no request can keep a worker busy for long.
+
+    {"id": 4, "op": "shuffle"}
+    {"id": 4, "error": "Unknown op: shuffle"}
+"""
+
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Hashable
+
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.model import GenerationError, generate_puzzle, get_solver
+from sudoku.models.notation import from_string, to_string
+
+
+Solution = tuple[tuple[int, ...], ...]
+Puzzle = list[list[int]]
+
+# fewest clues served. Nearly every digging pass gets down to 24, below
+# that the passes a puzzle takes grow quickly
+MIN_CLUES = 24
+MAX_LIMIT = 1000 # most solutions counted for a solve request
+
+
+class ServiceError(Exception):
+    """Raised by the client when the server answers with an error"""
+
+
+def _init_worker() -> None:
+    random.seed() # workers must not share the random state, whichever way they were started
+
+
+def generate_batch(clues: int, count: int, solver: str) -> list[tuple[str, str]]:
+    """Runs in a worker. Returns `count` (solution, puzzle) pairs as strings"""
+
+    backend = get_solver(solver)
+    pairs = (generate_puzzle(clues, backend) for _ in range(count))
+    return [(to_string(solution), to_string(puzzle)) for solution, puzzle in pairs]
+
+
+def solve_batch(requests: list[tuple[str, int]], solver: str) -> list[tuple[int, str | None]]:
+    """Runs in a worker. Returns (solutions, first solution) for every (puzzle, limit)"""
+
+    backend = get_solver(solver)
+    results = []
+    for puzzle, limit in requests:
+        board = backend(from_string(puzzle))
+        count = board.solve_multiple(limit)
+        results.append((count, to_string(board.solution) if board.solution else None))
+    return results
+
+
+def split_address(address: str) -> tuple[str, int] | str:
+    """"host:port" as a (host, port) pair, anything else is a Unix socket path"""
+
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+
+class _Batcher:
+    """
+    Collects work items for `linger` seconds and hands them to `run` in one
+    batch per worker, so many small requests share a round trip to the pool
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Hashable, list], Awaitable[list]],
+        workers: int,
+        max_batch: int,
+        linger: float
+    ) -> None:
+        self._run = run # run(key, items) returns one result per item
+        self._workers = workers
+        self._max_batch = max_batch
+        self._linger = linger
+        self._queues: dict[Hashable, list[tuple[object, asyncio.Future]]] = {}
+        self._is_scheduled = False
+        self.batches = 0
+
+    def submit(self, key: Hashable, item: object) -> asyncio.Future:
+        """Queues an item with the others of the same key. The future gets its result"""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queues.setdefault(key, []).append((item, future))
+        if not self._is_scheduled:
+            self._is_scheduled = True
+            loop.call_later(self._linger, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        self._is_scheduled = False
+        queues, self._queues = self._queues, {}
+        for key, queue in queues.items():
+            size = max(1, min(self._max_batch, math.ceil(len(queue) / self._workers)))
+            for start in range(0, len(queue), size):
+                self.batches += 1
+                asyncio.ensure_future(self._run_batch(key, queue[start:start + size]))
+
+    async def _run_batch(self, key: Hashable, batch: list[tuple[object, asyncio.Future]]) -> None:
+        try:
+            results = await self._run(key, [item for item, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class PuzzleServer:
+    def __init__(
+        self,
+        workers: int | None = None,
+        solver: str = "bitmask",
+        max_batch: int = 16,
+        linger: float = 0.002
+    ) -> None:
+        get_solver(solver) # fail early on an unknown backend
+        self._workers = workers or os.cpu_count() or 1
+        self._solver = solver
+        self._executor: ProcessPoolExecutor | None = None
+        self._server: asyncio.Server | None = None
+
+        self._generate_batcher = _Batcher(self._generate_batch, self._workers, max_batch, linger)
+        self._solve_batcher = _Batcher(self._solve_batch, self._workers, max_batch, linger)
+        self._solving: dict[tuple[str, int], asyncio.Future] = {} # in flight, for coalescing
+
+        self.requests = 0
+        self.coalesced = 0 # solve requests answered by an identical one in flight
+
+    @property
+    def batches(self) -> int:
+        return self._generate_batcher.batches + self._solve_batcher.batches
+
+    async def start(self, address: str) -> None:
+        # not forked, since forking a process with threads (fx a running event loop's) can deadlock
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._executor = ProcessPoolExecutor(self._workers, context, _init_worker)
+        # start every worker now, so the first clients do not wait for them
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _init_worker) for _ in range(self._workers)
+        ))
+
+        target = split_address(address)
+        if isinstance(target, tuple):
+            self._server = await asyncio.start_server(self._handle_connection, *target)
+        else:
+            self._server = await asyncio.start_unix_server(self._handle_connection, target)
+
+    @property
+    def address(self) -> tuple[str, int] | str:
+        """The address the server listens on, with the real port if 0 was asked for"""
+
+        if self._server is None:
+            raise ValueError("The server has not been started")
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            raise ValueError("The server has not been started")
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            # waits for the running batches, which are bounded, without blocking the loop
+            await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+            self._executor = None
+
+    async def generate(self, clues: int) -> dict:
+        if not MIN_CLUES <= clues <= 81:
+            raise ValueError(f"Clues have to be between {MIN_CLUES} and 81")
+        solution, puzzle = await self._generate_batcher.submit(clues, None)
+        return {"solution": solution, "puzzle": puzzle}
+
+    async def solve(self, puzzle: str, limit: int = 2) -> dict:
+        if limit < 1:
+            raise ValueError("The limit has to be at least 1")
+        limit = min(limit, MAX_LIMIT)
+        puzzle = to_string(from_string(puzzle)) # validates, and makes equal grids equal keys
+        key = (puzzle, limit)
+        future = self._solving.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = self._solve_batcher.submit(None, key)
+            self._solving[key] = future
+            future.add_done_callback(lambda _: self._solving.pop(key, None))
+        count, solution = await asyncio.shield(future) # a client leaving must not cancel the others
+        return {"count": count, "solution": solution}
+
+    async def _generate_batch(self, clues: Hashable, items: list) -> list:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, generate_batch, clues, len(items), self._solver
+        )
+
+    async def _solve_batch(self, _: Hashable, items: list) -> list:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, solve_batch, items, self._solver)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks: set[asyncio.Task] = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.ensure_future(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except (ConnectionError, ValueError): # ValueError if a line is over the read limit
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        response = await self._handle_request(line)
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def _handle_request(self, line: bytes) -> dict:
+        self.requests += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request has to be a JSON object")
+            request_id = request.get("id")
+            match request.get("op"):
+                case "generate":
+                    if "difficulty" in request:
+                        clues = Difficulty[str(request["difficulty"]).upper()].clues
+                    else:
+                        clues = int(request["clues"])
+                    response = await self.generate(clues)
+                case "solve":
+                    limit = request.get("limit")
+                    response = await self.solve(
+                        str(request["puzzle"]), int(limit) if limit is not None else 2
+                    )
+                case op:
+                    raise ValueError(f"Unknown op: {op}")
+        except KeyError as error:
+            response = {"error": f"Missing or unknown value: {error}"}
+        except (ValueError, TypeError, GenerationError) as error:
+            response = {"error": str(error)}
+        response["id"] = request_id
+        return response
+
+
+class PuzzleClient:
+    """
+    Blocking client for PuzzleServer. Safe to share between threads, so
+    `client.generate` can be the generate function of a PuzzlePool
+    """
+
+    def __init__(self, address: str, timeout: float | None = None) -> None:
+        target = split_address(address)
+        if isinstance(target, tuple):
+            self._socket = socket.create_connection(target, timeout)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(target)
+        self._file = self._socket.makefile("rwb")
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def __enter__(self) -> "PuzzleClient":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def generate(self, clues: int) -> tuple[Solution, Puzzle]:
+        """Returns a new (solution, puzzle) pair, like generate_puzzle"""
+
+        response = self._request({"op": "generate", "clues": clues})
+        solution = from_string(response["solution"])
+        return tuple(tuple(row) for row in solution), from_string(response["puzzle"])
+
+    def solve(self, board: Puzzle, limit: int = 2) -> tuple[int, Puzzle | None]:
+        """Returns the number of solutions (up to limit, at most MAX_LIMIT) and the first one"""
+
+        response = self._request({"op": "solve", "puzzle": to_string(board), "limit": limit})
+        solution = response["solution"]
+        return response["count"], from_string(solution) if solution is not None else None
+
+    def _request(self, request: dict) -> dict:
+        with self._lock:
+            self._next_id += 1
+            request["id"] = self._next_id
+            self._file.write(json.dumps(request).encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise ServiceError("The server closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise ServiceError(response["error"])
+        return response
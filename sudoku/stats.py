@@ -0,0 +1,140 @@
+"""
+Counters and timers for the hot paths, off unless enabled.
+
+Instrumented code checks `STATS.enabled` before doing any work, so when
+stats are off the only cost is that attribute lookup:
+
+    if STATS.enabled:
+        STATS.count("solver.nodes", self.nodes)
+
+Solvers count nodes in plain attributes while they search and hand the
+totals over once per solve, instead of touching STATS on every node.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    """Running summary of the durations recorded under one name"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock() # the puzzle pool records from its own threads
+        self._counters: dict[str, int] = {}
+        self._timers: dict[str, Timer] = {}
+        self._reporter: threading.Thread | None = None
+        self._stop_reporting = threading.Event()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = Timer()
+            timer.add(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Records how long the block takes, if stats are enabled"""
+
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def get_timer(self, name: str) -> dict[str, float]:
+        timer = self._timers.get(name)
+        return (timer or Timer()).as_dict()
+
+    def snapshot(self) -> dict[str, dict]:
+        """All counters and timers, as plain values that can be written as JSON"""
+
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timers": {name: timer.as_dict() for name, timer in self._timers.items()},
+            }
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+    def start_reporting(self, interval: float, path: str | None = None) -> None:
+        """
+        Logs the stats every `interval` seconds from a daemon thread, and
+        writes them as JSON to `path` too if it is given
+        """
+
+        if self._reporter is not None:
+            return
+        self._stop_reporting.clear()
+
+        def report() -> None:
+            while not self._stop_reporting.wait(interval):
+                logger.info("stats: %s", json.dumps(self.snapshot()))
+                if path is not None:
+                    self.dump(path)
+
+        self._reporter = threading.Thread(target=report, name="stats-reporter", daemon=True)
+        self._reporter.start()
+
+    def stop_reporting(self) -> None:
+        if self._reporter is not None:
+            self._stop_reporting.set()
+            self._reporter.join()
+            self._reporter = None
+
+
+STATS = Stats()
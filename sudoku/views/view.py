@@ -1,97 +1,163 @@
 import tkinter as tk
-from enum import Enum
 from typing import Callable
 
-from sudoku.models.model import CellModel, MainModel, BoardModel
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.cell import CellModel
+from sudoku.models.model import MainModel, BoardModel
 from sudoku.models.model import BoardValue
+from sudoku.models.solver import get_geometry
 
 
 class Width: # const values
-    """Contains constant side lengths used in the View"""
+    """
+    Contains constant side lengths used in the View. The grid has the same
+    width for every board size, so the cells of bigger boards are smaller
+    """
     MARGIN = 20
-    CELL = 50
+    CELL = 50 # of a 9x9 board
     GRID = 9 * CELL
     BOARD = 2 * MARGIN + GRID
 
 
-class Difficulty(Enum):
-    EASY   = "Easy"
-    MEDIUM = "Medium"
-    HARD   = "Hard"
-    EXPERT = "Expert"
-
-
 class BoardView(tk.Canvas):
     def __init__(self, root: tk.Tk, board_model: BoardModel) -> None:
         super().__init__(root)
+        self._board_model = board_model
+        self._size = board_model.size
+        self._cell_width = Width.GRID // self._size
+        self._peers = get_geometry(board_model.order).peers
+        self._cursor = (0, 0)
+
         self._configure_view()
         self._draw_ui()
 
-        self._board_model = board_model
-        self._cursor = (0, 0)
+        # canvas items are created once and only reconfigured afterwards
+        size = self._size
+        self._cell_items = [[self._create_cell(x, y) for x in range(size)] for y in range(size)]
+        self._note_items = [[self._create_note(x, y) for x in range(size)] for y in range(size)]
+        self._show_notes = False
+        self._cursor_item = self.create_rectangle(0, 0, 0, 0, width=2, outline="red", tags="cursor")
+        self._create_win_screen()
 
         self.update_cursor(self._cursor[0], self._cursor[1])
         self.update_board()
+        self._board_model.add_listener(self.update_cell)
 
         self.pack()
 
+    @property
+    def size(self) -> int:
+        """Cells in every row and column"""
+
+        return self._size
+
+    @property
+    def cell_width(self) -> int:
+        return self._cell_width
+
     def _configure_view(self) -> None:
         self["bg"] = "white"
         self["width"] = Width.BOARD
         self["height"] = Width.BOARD
 
     def update_board(self) -> None:
-        """ Used for updating cells on the board
+        """ Used for updating all cells on the board
         and clearing winscreen after starting new game
         """
-        self.delete("puzzle")
-        self.delete("win_screen")
+        self.hide_win_screen()
 
-        for y in range(9):
-            for x in range(9):
-                self._fill_cell(x, y, self._board_model.get_cell(x, y))
+        for y in range(self._size):
+            for x in range(self._size):
+                self.update_cell(x, y)
 
-    def _fill_cell(self, x, y, cell: CellModel):
+    def update_cell(self, x: int, y: int) -> None:
+        """Redraws the number of a single cell, and the notes it affects"""
+
+        cell: CellModel = self._board_model.get_cell(x, y)
         number = cell.current
-        if number != BoardValue.EMPTY_CELL:
-            self.create_text(
-                # at the center:
-                x * Width.CELL + Width.MARGIN + Width.CELL // 2,
-                y * Width.CELL + Width.MARGIN + Width.CELL // 2,
-                text=number, tags="puzzle",
-                fill="black" if cell.is_clue else "blue",
-                font=("Arial", Width.CELL // 4)
-            )
-    def draw_win_screen(self) -> None:
-        """Draws a white box infront of the board with a text=You Won!"""
+        self.itemconfigure(
+            self._cell_items[y][x],
+            text=number if number != BoardValue.EMPTY_CELL else "",
+            fill="black" if cell.is_clue else "blue"
+        )
+
+        if self._show_notes:
+            self._update_note(x, y)
+            for i in self._peers[y * self._size + x]:
+                self._update_note(i % self._size, i // self._size)
+
+    def toggle_notes(self) -> None:
+        """Shows or hides the candidates of every empty cell"""
+
+        self._show_notes = not self._show_notes
+        if self._show_notes:
+            for y in range(self._size):
+                for x in range(self._size):
+                    self._update_note(x, y)
+        self.itemconfigure("notes", state="normal" if self._show_notes else "hidden")
+
+    def _update_note(self, x: int, y: int) -> None:
+        # the candidates in the same layout as the cells of a box
+        candidates = self._board_model.get_candidates(x, y)
+        order = self._board_model.order
+        text = "\n".join(
+            " ".join(str(n) if n in candidates else " " for n in range(row, row + order))
+            for row in range(1, self._size + 1, order)
+        ) if candidates else ""
+        self.itemconfigure(self._note_items[y][x], text=text)
+
+    def _create_cell(self, x: int, y: int) -> int:
+        return self.create_text(
+            # at the center:
+            x * self._cell_width + Width.MARGIN + self._cell_width // 2,
+            y * self._cell_width + Width.MARGIN + self._cell_width // 2,
+            text="", tags="puzzle",
+            font=("Arial", self._cell_width // 4)
+        )
+
+    def _create_note(self, x: int, y: int) -> int:
+        return self.create_text(
+            x * self._cell_width + Width.MARGIN + self._cell_width // 2,
+            y * self._cell_width + Width.MARGIN + self._cell_width // 2,
+            text="", tags="notes", state="hidden", fill="gray",
+            font=("Arial", max(1, self._cell_width // (2 * self._board_model.order + 1)))
+        )
+
+    def _create_win_screen(self) -> None:
+        """Creates a hidden white box infront of the board with a text=You Won!"""
         self.create_rectangle(
             0, 0, Width.BOARD+1, Width.BOARD+1,
-            fill="white", tags="win_screen"
+            fill="white", tags="win_screen", state="hidden"
         )
         self.create_text(
             Width.BOARD // 2, Width.BOARD // 2,
-            text="You Won!", tags="win_screen"
+            text="You Won!", tags="win_screen", state="hidden"
         )
 
+    def draw_win_screen(self) -> None:
+        self.tag_raise("win_screen")
+        self.itemconfigure("win_screen", state="normal")
+
+    def hide_win_screen(self) -> None:
+        self.itemconfigure("win_screen", state="hidden")
+
 
     def get_cursor(self) -> tuple[int, int]:
         return self._cursor
 
     def update_cursor(self, x: int, y: int) -> None:
-        """Draws a red square (cursor) at (x,y)"""
-
-        self.delete("cursor") # delete old cursor if any
+        """Moves the red square (cursor) to (x,y)"""
 
         # x0, y0 represents the top left corner of the cell x, y are in
-        y0 = Width.MARGIN + y * Width.CELL
-        x0 = Width.MARGIN + x * Width.CELL
+        y0 = Width.MARGIN + y * self._cell_width
+        x0 = Width.MARGIN + x * self._cell_width
 
-        self.create_rectangle( # the 1's keep the rectangle within the cell boarder
+        self.coords( # the 1's keep the rectangle within the cell boarder
+            self._cursor_item,
             x0 + 1,
             y0 + 1,
-            x0 + Width.CELL - 1,
-            y0 + Width.CELL - 1,
-            width=2, outline="red", tags="cursor"
+            x0 + self._cell_width - 1,
+            y0 + self._cell_width - 1
         )
         self._cursor = (x, y)
 
@@ -99,8 +165,8 @@ class BoardView(tk.Canvas):
     def _draw_ui(self) -> None:
         """Draw the grid lines for the sudoku board"""
 
-        for i in range(10):
-            if i % 3 == 0: # is ith line a subgrid border line
+        for i in range(self._size + 1):
+            if i % self._board_model.order == 0: # is ith line a subgrid border line
                 self._draw_vertical_line(index=i, fill="black", width=2)
                 self._draw_horizontal_line(index=i, fill="black", width=2)
             else:
@@ -109,19 +175,19 @@ class BoardView(tk.Canvas):
 
     def _draw_vertical_line(self, index: int, fill: str, width: int) -> None:
         self.create_line(
-            Width.MARGIN + index * Width.CELL,
+            Width.MARGIN + index * self._cell_width,
             Width.MARGIN,
-            Width.MARGIN + index * Width.CELL,
-            Width.BOARD - Width.MARGIN,
+            Width.MARGIN + index * self._cell_width,
+            Width.MARGIN + self._size * self._cell_width,
             fill=fill, width=width
         )
 
     def _draw_horizontal_line(self, index: int, fill: str, width: int) -> None:
         self.create_line(
             Width.MARGIN,
-            Width.MARGIN + index * Width.CELL,
-            Width.BOARD - Width.MARGIN,
-            Width.MARGIN + index * Width.CELL,
+            Width.MARGIN + index * self._cell_width,
+            Width.MARGIN + self._size * self._cell_width,
+            Width.MARGIN + index * self._cell_width,
             fill=fill, width=width
         )
 
@@ -0,0 +1,60 @@
+import unittest, os, tempfile, logging
+from sudoku.models.bank import BankWriter, PuzzleBank, pack_grid, unpack_grid
+from sudoku.models.model import BoardModel, generate_puzzle
+
+
+class TestPuzzleBank(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "puzzles.bank")
+
+        self.puzzles = [generate_puzzle(clues) for clues in (38, 31, 38, 34)]
+        with BankWriter(self.path) as writer:
+            for solution, puzzle in self.puzzles:
+                writer.add(puzzle, solution)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_pack_grid(self):
+        self.logger.info("running: test_pack_grid")
+
+        solution, puzzle = self.puzzles[0]
+        self.assertEqual(len(pack_grid(puzzle)), 41)
+        self.assertEqual(unpack_grid(pack_grid(puzzle)), puzzle)
+
+    def test_random_access(self):
+        self.logger.info("running: test_random_access")
+
+        with PuzzleBank(self.path) as bank:
+            self.assertEqual(len(bank), 4)
+            for k, (solution, puzzle) in enumerate(self.puzzles):
+                with self.subTest(k=k):
+                    self.assertEqual(bank.get(k), (solution, puzzle))
+            with self.assertRaises(IndexError):
+                bank.get(4)
+
+    def test_difficulty_index(self):
+        self.logger.info("running: test_difficulty_index")
+
+        with PuzzleBank(self.path) as bank:
+            self.assertEqual(sorted(bank.clue_counts()), [31, 34, 38])
+            self.assertEqual(bank.count(38), 2)
+            self.assertEqual(bank.count(17), 0)
+            self.assertEqual(bank.get_by_clues(38, 1), self.puzzles[2])
+
+    def test_board_model_loads_from_bank(self):
+        self.logger.info("running: test_board_model_loads_from_bank")
+
+        with PuzzleBank(self.path) as bank:
+            board = BoardModel(bank=bank)
+            board.load_from_bank(1)
+            solution, puzzle = self.puzzles[1]
+            self.assertEqual(board.get_cell(4, 2).current, puzzle[2][4])
+            self.assertEqual(board.get_cell(4, 2).solution, solution[2][4])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest, random, logging, importlib.util
+from sudoku.models.model import generate_puzzle
+from sudoku.models.solver import BitmaskSolver
+
+if importlib.util.find_spec("numpy"):
+    import numpy as np
+    from sudoku.models.batch import propagate, solve_batch
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "needs NumPy")
+class TestBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(22)
+        self.pairs = [generate_puzzle(clues) for clues in (24, 26, 30, 36, 45)]
+        self.logger = logging.getLogger(__name__)
+
+    def test_propagate(self):
+        self.logger.info("running: test_propagate")
+
+        solution, puzzle = self.pairs[-1]
+        candidates = propagate(np.array([puzzle]))
+        self.assertEqual(candidates.shape, (1, 81, 9))
+        # every candidate left is in the solution, and the clues are kept
+        cells = [value for row in solution for value in row]
+        self.assertTrue(all(candidates[0, i, value - 1] for i, value in enumerate(cells)))
+        self.assertTrue(all(candidates[0, i].sum() == 1 for i in range(81) if puzzle[i // 9][i % 9]))
+
+    def test_matches_bitmask_solver(self):
+        self.logger.info("running: test_matches_bitmask_solver")
+
+        puzzles = [puzzle for _, puzzle in self.pairs]
+        several = [row[:] for row in self.pairs[0][1]]
+        first = next(i for i in range(81) if several[i // 9][i % 9])
+        several[first // 9][first % 9] = 0
+        conflicting = [row[:] for row in self.pairs[2][1]]
+        conflicting[0] = [5, 5] + conflicting[0][2:]
+        puzzles += [several, conflicting, [[0] * 9 for _ in range(9)]]
+
+        result = solve_batch(np.array(puzzles), limit=2)
+        self.assertEqual(result.counts.tolist(), [BitmaskSolver(puzzle).solve_multiple(2) for puzzle in puzzles])
+        for (solution, _), found in zip(self.pairs, result.solutions):
+            self.assertEqual(found.tolist(), [list(row) for row in solution])
+        self.assertFalse(result.solutions[6].any())
+        self.assertTrue(result.searched[-1]) # the empty grid needs a search
+        self.assertFalse(result.searched[6])
+
+    def test_invalid(self):
+        self.logger.info("running: test_invalid")
+
+        with self.assertRaises(ValueError):
+            solve_batch(np.zeros((2, 9, 8), dtype=int))
+        with self.assertRaises(ValueError):
+            solve_batch(np.full((1, 9, 9), 10))
+        with self.assertRaises(ValueError):
+            solve_batch(np.zeros((1, 9, 9), dtype=int), limit=0)
+        self.assertEqual(len(solve_batch(np.zeros((0, 9, 9), dtype=int)).counts), 0)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest, logging, os, tempfile
+from sudoku.models.cache import PuzzleCache, PuzzleId
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.model import BoardModel, generate_from_id
+
+
+class TestPuzzleId(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logger = logging.getLogger(__name__)
+
+    def test_parse(self):
+        self.logger.info("running: test_parse")
+
+        self.assertEqual(PuzzleId.parse("36-20261018"), PuzzleId(20261018, 36))
+        self.assertEqual(PuzzleId.parse("expert-7"), PuzzleId.for_difficulty(7, Difficulty.EXPERT))
+        self.assertEqual(PuzzleId.parse(str(PuzzleId(5, 31))), PuzzleId(5, 31))
+        for text in ("36", "36-x", "impossible-3"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    PuzzleId.parse(text)
+
+    def test_same_id_same_puzzle(self):
+        self.logger.info("running: test_same_id_same_puzzle")
+
+        self.assertEqual(generate_from_id(PuzzleId(1, 34)), generate_from_id(PuzzleId(1, 34)))
+        self.assertNotEqual(generate_from_id(PuzzleId(1, 34)), generate_from_id(PuzzleId(2, 34)))
+
+
+class TestPuzzleCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.logger = logging.getLogger(__name__)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_memory(self):
+        self.logger.info("running: test_memory")
+
+        cache = PuzzleCache(generate_from_id)
+        first = cache.get(PuzzleId(3, 36))
+        first[1][0][0] = 0 # changing the returned puzzle must not change the cached one
+        self.assertEqual(cache.get(PuzzleId(3, 36)), generate_from_id(PuzzleId(3, 36)))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_shared_directory(self):
+        self.logger.info("running: test_shared_directory")
+
+        puzzle_id = PuzzleId(4, 31)
+        expected = PuzzleCache(generate_from_id, self.directory.name).get(puzzle_id)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, f"{puzzle_id.key}.txt")))
+
+        def fail(_: PuzzleId):
+            raise AssertionError("Generated a cached puzzle")
+        cache = PuzzleCache(fail, self.directory.name) # fx on another host
+        self.assertEqual(cache.get(puzzle_id), expected)
+        self.assertEqual(cache.hits, 1)
+
+    def test_board_loads_by_id(self):
+        self.logger.info("running: test_board_loads_by_id")
+
+        board = BoardModel(cache=PuzzleCache(generate_from_id))
+        board.load_by_id(PuzzleId(5, 38))
+        solution, puzzle = generate_from_id(PuzzleId(5, 38))
+        self.assertEqual(board.puzzle_id, PuzzleId(5, 38))
+        self.assertEqual(board.get_number(0, 0), puzzle[0][0])
+        self.assertEqual(board.get_solution(8, 8), solution[8][8])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
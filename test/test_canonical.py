@@ -0,0 +1,68 @@
+import unittest, random, logging
+from sudoku.models.canonical import DedupIndex, canonical_grid, canonical_puzzle, canonical_transforms
+from sudoku.models.model import generate_puzzle
+from sudoku.models.solver import fill_grid
+from sudoku.models.symmetry import random_transform
+
+
+def flat(grid) -> tuple[int, ...]:
+    return tuple(value for row in grid for value in row)
+
+
+class TestCanonical(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = random.Random(17)
+        self.logger = logging.getLogger(__name__)
+
+    def test_grid_invariant(self):
+        self.logger.info("running: test_grid_invariant")
+
+        for _ in range(10):
+            grid = tuple(fill_grid(self.rng))
+            canonical = canonical_grid(grid)
+            self.assertEqual(canonical[:9], tuple(range(1, 10)))
+            for _ in range(5):
+                transform = random_transform(self.rng)
+                self.assertEqual(canonical_grid(transform.apply(grid)), canonical)
+                self.assertLessEqual(canonical, transform.apply(grid))
+
+    def test_transforms_give_canonical_form(self):
+        self.logger.info("running: test_transforms_give_canonical_form")
+
+        # the pattern the old generator used, which has many automorphisms
+        grid = tuple((3 * (r % 3) + r // 3 + c) % 9 + 1 for r in range(9) for c in range(9))
+        canonical, transforms = canonical_transforms(grid)
+        self.assertGreater(len(transforms), 1)
+        for transform in transforms:
+            self.assertEqual(transform.apply(grid), canonical)
+
+    def test_puzzle_invariant(self):
+        self.logger.info("running: test_puzzle_invariant")
+
+        solution, puzzle = generate_puzzle(30, rng=self.rng)
+        puzzle, solution = flat(puzzle), flat(solution)
+        canonical = canonical_puzzle(puzzle, solution)
+        transform = random_transform(self.rng)
+        self.assertEqual(canonical_puzzle(transform.apply(puzzle)), canonical)
+
+        with self.assertRaises(ValueError):
+            canonical_puzzle((0,) * 81)
+
+    def test_dedup_index(self):
+        self.logger.info("running: test_dedup_index")
+
+        solution, puzzle = generate_puzzle(32, rng=self.rng)
+        puzzle, solution = flat(puzzle), flat(solution)
+        transform = random_transform(self.rng)
+        other_solution, other = generate_puzzle(32, rng=self.rng)
+
+        index = DedupIndex()
+        self.assertTrue(index.add(puzzle, solution))
+        self.assertFalse(index.add(transform.apply(puzzle), transform.apply(solution)))
+        self.assertTrue(index.add(flat(other), flat(other_solution)))
+        self.assertEqual(len(index), 2)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest, io, logging
+from generate import parse_args, run, text_writer
+from sudoku.models.canonical import canonical_grid, canonical_puzzle
+from sudoku.models.model import RESEED_EVERY
+from sudoku.models.notation import from_string
+from sudoku.models.solver import BitmaskSolver
+
+
+class TestGenerate(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logger = logging.getLogger(__name__)
+
+    def _generate(self, argv: list[str]) -> list[str]:
+        output = io.StringIO()
+        run(parse_args(argv), text_writer(output))
+        return output.getvalue().splitlines()
+
+    def test_output(self):
+        self.logger.info("running: test_output")
+
+        lines = self._generate(["-n", "3", "-d", "expert", "-c", "30", "-w", "2", "--chunk-size", "2"])
+        self.assertEqual(len(lines), 6)
+        for line in lines:
+            with self.subTest(line=line):
+                puzzle, solution, clues = line.split()
+                board = from_string(puzzle)
+                solver = BitmaskSolver(board)
+                self.assertEqual(solver.solve_multiple(), 1)
+                self.assertEqual(solver.solution, from_string(solution))
+                self.assertEqual(81 - puzzle.count("."), int(clues))
+
+    def test_deterministic_with_seed(self):
+        self.logger.info("running: test_deterministic_with_seed")
+
+        argv = ["-n", "4", "-c", "32", "--chunk-size", "1", "-s", "5"]
+        self.assertEqual(
+            sorted(self._generate(argv + ["-w", "1"])),
+            sorted(self._generate(argv + ["-w", "3"]))
+        )
+
+    def test_dedup(self):
+        self.logger.info("running: test_dedup")
+
+        for mode, canonical in (("puzzle", canonical_puzzle), ("solution", canonical_grid)):
+            with self.subTest(mode=mode):
+                lines = self._generate(["-n", "4", "-c", "36", "--chunk-size", "3", "--dedup", mode])
+                self.assertEqual(len(lines), 4)
+                forms = set()
+                for line in lines:
+                    puzzle, solution, _ = line.split()
+                    grid = tuple(value for row in from_string(solution) for value in row)
+                    if mode == "puzzle":
+                        forms.add(canonical(tuple(value for row in from_string(puzzle) for value in row), grid))
+                    else:
+                        forms.add(canonical(grid))
+                self.assertEqual(len(forms), 4)
+
+        with self.assertRaises(SystemExit):
+            parse_args(["--dedup", "solution", "--reseed-every", "2"])
+        for argv in (["-c", "82"], ["--solver", "bitmsk"]):
+            with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                parse_args(argv)
+        self.assertEqual(parse_args(["--dedup", "solution"]).reseed_every, 1)
+        self.assertEqual(parse_args([]).reseed_every, RESEED_EVERY)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest, os, random, tempfile, logging, importlib.util
+from sudoku.models.bank import BankWriter, PuzzleBank
+from sudoku.models.difficulty import Difficulty
+from sudoku.models.model import SolutionGenerator, generate_puzzle
+
+if importlib.util.find_spec("numpy"):
+    import numpy as np
+    from sudoku.models.integrity import check, check_bank, invalid_solutions, load_bank
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "needs NumPy")
+class TestIntegrity(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(25)
+        self.pairs = [generate_puzzle(difficulty.clues) for difficulty in Difficulty]
+        self.puzzles = np.array([puzzle for _, puzzle in self.pairs])
+        self.solutions = np.array([solution for solution, _ in self.pairs])
+        self.logger = logging.getLogger(__name__)
+
+    def test_invalid_solutions(self):
+        self.logger.info("running: test_invalid_solutions")
+
+        generator = SolutionGenerator()
+        solutions = np.array([generator.create() for _ in range(200)])
+        self.assertFalse(invalid_solutions(solutions).any())
+
+        solutions[3, 0, [0, 1]] = solutions[3, 0, [1, 0]] # still a valid row, but not columns
+        solutions[7, 4, 4] = 0
+        solutions[9] = np.arange(81).reshape(9, 9) % 9 + 1 # every row valid, columns not
+        solutions[11, 2, 2] = 10
+        self.assertEqual(np.flatnonzero(invalid_solutions(solutions)).tolist(), [3, 7, 9, 11])
+
+    def test_check(self):
+        self.logger.info("running: test_check")
+
+        self.assertTrue(check(self.puzzles, self.solutions).is_ok)
+
+        puzzles, solutions = self.puzzles.copy(), self.solutions.copy()
+        y, x = np.argwhere(puzzles[1])[0]
+        puzzles[1, y, x] = puzzles[1, y, x] % 9 + 1 # a wrong clue
+        y, x = np.argwhere(puzzles[3] == 0)[0]
+        puzzles[3, y, x] = solutions[3, y, x] # a right clue too many
+        solutions[0, [0, 3]] = solutions[0, [3, 0]] # rows of different bands swapped
+
+        report = check(puzzles, solutions)
+        self.assertFalse(report.is_ok)
+        self.assertEqual(report.invalid_solutions.tolist(), [0])
+        self.assertEqual(report.wrong_clues.tolist(), [0, 1])
+        self.assertEqual(report.wrong_clue_counts.tolist(), [3])
+        self.assertEqual(check(puzzles, solutions, clues=[38, 36, 34, 32]).wrong_clue_counts.tolist(), [])
+
+        with self.assertRaises(ValueError):
+            check(puzzles, solutions[:2])
+
+    def test_bank(self):
+        self.logger.info("running: test_bank")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "puzzles.bank")
+            with BankWriter(path) as writer:
+                for solution, puzzle in self.pairs:
+                    writer.add(puzzle, solution)
+
+            with PuzzleBank(path) as bank:
+                puzzles, solutions = load_bank(bank)
+                self.assertEqual(puzzles.tolist(), self.puzzles.tolist())
+                self.assertEqual(solutions.tolist(), self.solutions.tolist())
+                self.assertTrue(check_bank(bank).is_ok)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -1,5 +1,12 @@
-import unittest, random, logging
-from sudoku.model import SolutionGenerator
+import unittest, random, logging, threading, time, subprocess, sys
+from sudoku.models.cache import PuzzleCache
+from sudoku.models.cancel import CancelToken
+from sudoku.models.model import (
+    SolutionGenerator, PuzzleGenerator, BoardModel, GenerationCancelled, GenerationError,
+    generate_from_id, generate_puzzle
+)
+from sudoku.models.rater import Technique, rate
+from sudoku.models.solver import BitmaskSolver, get_geometry
 
 
 class TestSolutionGenerator(unittest.TestCase):
@@ -59,6 +66,317 @@ class TestSolutionGenerator(unittest.TestCase):
                     set(range(1, 10, 1))
                 )
 
+    def test_larger_orders(self):
+        self.logger.info("running: test_larger_orders")
+
+        for order in (2, 4, 5):
+            with self.subTest(order=order):
+                solution = SolutionGenerator(random.Random(order), order=order).create()
+                cells = [x for row in solution for x in row]
+                size = order * order
+                for unit in get_geometry(order).units:
+                    self.assertEqual({cells[i] for i in unit}, set(range(1, size + 1)))
+
+
+class TestPuzzleGenerator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.solution = SolutionGenerator().create()
+        self.logger = logging.getLogger(__name__)
+
+    def test_clue_count_and_uniqueness(self):
+        self.logger.info("running: test_clue_count_and_uniqueness")
+
+        for clues in (38, 31, 26):
+            with self.subTest(clues=clues):
+                puzzle = PuzzleGenerator(self.solution).create(clues)
+                self.assertEqual(sum(x != 0 for row in puzzle for x in row), clues)
+                self.assertEqual(BitmaskSolver(puzzle).solve_multiple(), 1)
+                self.assertTrue(all(
+                    puzzle[y][x] in (0, self.solution[y][x])
+                    for y in range(9) for x in range(9)
+                ))
+
+    def test_symmetric(self):
+        self.logger.info("running: test_symmetric")
+
+        puzzle = PuzzleGenerator(self.solution, symmetric=True).create(32)
+        cells = [x for row in puzzle for x in row]
+        self.assertTrue(all((cells[i] == 0) == (cells[80 - i] == 0) for i in range(81)))
+
+    def test_deterministic_with_rng(self):
+        self.logger.info("running: test_deterministic_with_rng")
+
+        puzzles = [
+            PuzzleGenerator(self.solution, rng=random.Random(9)).create(30) for _ in range(2)
+        ]
+        self.assertEqual(puzzles[0], puzzles[1])
+
+    def test_bounded(self):
+        self.logger.info("running: test_bounded")
+
+        generator = PuzzleGenerator(self.solution, rng=random.Random(3))
+        for clues in (-1, 82):
+            with self.subTest(clues=clues), self.assertRaises(ValueError):
+                generator.create(clues)
+        with self.assertRaises(GenerationError):
+            generator.create(17, max_passes=2)
+        self.assertEqual(generator.attempts, 2)
+        self.assertEqual(generator.create(81), [list(row) for row in self.solution])
+
+    def test_deadline_and_progress(self):
+        self.logger.info("running: test_deadline_and_progress")
+
+        progress = []
+        generator = PuzzleGenerator(self.solution, rng=random.Random(5))
+        with self.assertRaises(GenerationError) as raised:
+            generator.create(17, deadline=time.monotonic() + 0.2, progress=lambda *args: progress.append(args))
+        self.assertEqual([passes for passes, _ in progress], list(range(1, generator.attempts + 1)))
+        fewest = progress[-1][1]
+        self.assertEqual(sum(x != 0 for row in raised.exception.best for x in row), fewest)
+        self.assertEqual(BitmaskSolver(raised.exception.best).solve_multiple(), 1)
+
+    def test_cancel(self):
+        self.logger.info("running: test_cancel")
+
+        token = CancelToken()
+        threading.Timer(0.1, token.cancel).start()
+        start = time.monotonic()
+        with self.assertRaises(GenerationCancelled):
+            PuzzleGenerator(self.solution).create(17, cancel=token)
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_16x16(self):
+        self.logger.info("running: test_16x16")
+
+        rng = random.Random(16)
+        solution = SolutionGenerator(rng, order=4).create()
+        puzzle = PuzzleGenerator(solution, symmetric=True, rng=rng).create(120)
+        cells = [x for row in puzzle for x in row]
+        self.assertEqual(sum(x != 0 for x in cells), 120)
+        self.assertTrue(all((cells[i] == 0) == (cells[255 - i] == 0) for i in range(256)))
+        self.assertEqual(BitmaskSolver(puzzle).solve_multiple(), 1)
+
+
+class TestBoardModel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.board = BoardModel()
+        self.solution, self.puzzle = generate_puzzle(77)
+        self.board.load_puzzle(self.solution, self.puzzle)
+        self.empty = [(x, y) for y in range(9) for x in range(9) if self.puzzle[y][x] == 0]
+        self.logger = logging.getLogger(__name__)
+
+    def test_is_complete(self):
+        self.logger.info("running: test_is_complete")
+
+        for x, y in self.empty:
+            self.assertFalse(self.board.is_complete())
+            self.board.set_number(x, y, self.solution[y][x])
+        self.assertTrue(self.board.is_complete())
+
+        x, y = self.empty[0]
+        self.board.set_number(x, y, 0)
+        self.assertFalse(self.board.is_complete())
+
+    def test_conflicts(self):
+        self.logger.info("running: test_conflicts")
+
+        x, y = self.empty[0]
+        wrong = self.solution[y][(x + 1) % 9] # used elsewhere in the row
+        self.assertTrue(self.board.is_conflicting(x, y, wrong))
+        self.assertFalse(self.board.is_conflicting(x, y, self.solution[y][x]))
+        self.assertEqual(self.board.get_conflicts(), set())
+
+        self.board.set_number(x, y, wrong)
+        expected = {(x, y)} | {
+            (i, j) for j in range(9) for i in range(9)
+            if self.puzzle[j][i] == wrong and (i == x or j == y or (i // 3, j // 3) == (x // 3, y // 3))
+        }
+        self.assertIn(((x + 1) % 9, y), expected)
+        self.assertEqual(self.board.get_conflicts(), expected)
+
+        self.board.set_number(x, y, 0)
+        self.assertEqual(self.board.get_conflicts(), set())
+
+    def test_candidates(self):
+        self.logger.info("running: test_candidates")
+
+        random.seed(9)
+        for _ in range(30):
+            x, y = random.choice(self.empty)
+            self.board.set_number(x, y, random.randint(0, 9))
+
+        for x, y in self.empty:
+            with self.subTest(x=x, y=y):
+                if self.board.get_cell(x, y).current:
+                    self.assertEqual(self.board.get_candidates(x, y), [])
+                else:
+                    expected = [n for n in range(1, 10) if not self.board.is_conflicting(x, y, n)]
+                    self.assertEqual(self.board.get_candidates(x, y), expected)
+
+    def test_hints_solve_puzzle(self):
+        self.logger.info("running: test_hints_solve_puzzle")
+
+        self.board.load_puzzle(*generate_puzzle(28))
+        x, y = next((x, y) for y in range(9) for x in range(9) if not self.board.get_cell(x, y).current)
+        wrong = next(n for n in range(1, 10) if n != self.board.get_cell(x, y).solution)
+        self.board.set_number(x, y, wrong)
+
+        hint = self.board.get_hint()
+        self.assertEqual((hint.x, hint.y, hint.technique), (x, y, None))
+
+        while not self.board.is_complete():
+            hint = self.board.get_hint()
+            self.assertEqual(hint.number, self.board.get_cell(hint.x, hint.y).solution)
+            self.board.set_number(hint.x, hint.y, hint.number)
+        self.assertIsNone(self.board.get_hint())
+
+    def test_hint_techniques(self):
+        self.logger.info("running: test_hint_techniques")
+
+        rng = random.Random(4)
+        while True: # a puzzle that takes more than singles
+            solution, puzzle = generate_puzzle(24, rng=rng)
+            rating = rate(puzzle)
+            if rating.solved and rating.hardest.weight > Technique.HIDDEN_SINGLE.weight:
+                break
+        self.board.load_puzzle(solution, puzzle)
+
+        techniques = set()
+        while not self.board.is_complete():
+            hint = self.board.get_hint()
+            self.assertEqual(hint.number, solution[hint.y][hint.x])
+            techniques.add(hint.technique)
+            self.board.set_number(hint.x, hint.y, hint.number)
+        self.assertNotIn(None, techniques)
+        self.assertEqual(max(techniques, key=lambda technique: technique.weight), rating.hardest)
+
+    def test_snapshot(self):
+        self.logger.info("running: test_snapshot")
+
+        snapshot = self.board.snapshot()
+        for x, y in self.empty:
+            self.board.get_cell(x, y).current = self.solution[y][x]
+        self.assertTrue(self.board.is_complete())
+
+        self.board.restore(snapshot)
+        x, y = self.empty[0]
+        self.assertEqual(self.board.get_cell(x, y).current, 0)
+        self.assertFalse(self.board.is_complete())
+        with self.assertRaises(ValueError):
+            self.board.get_cell(x, y).current = 10
+
+    def test_undo_redo(self):
+        self.logger.info("running: test_undo_redo")
+
+        (x, y), (x2, y2) = self.empty[:2]
+        start = self.board.snapshot()
+        self.assertIsNone(self.board.undo())
+        self.board.set_number(x, y, self.solution[y][x])
+        self.board.set_number(x2, y2, self.solution[y2][x2])
+        self.board.set_number(x, y, 0)
+        self.assertEqual(len(self.board.journal), 3)
+
+        self.assertEqual(self.board.undo(), (x, y))
+        self.assertEqual(self.board.get_number(x, y), self.solution[y][x])
+        self.assertEqual(self.board.undo(), (x2, y2))
+        self.assertEqual(self.board.redo(), (x2, y2))
+        self.assertEqual(self.board.get_number(x2, y2), self.solution[y2][x2])
+
+        # a new move drops the moves that were undone
+        self.board.set_number(x, y, 0)
+        self.assertIsNone(self.board.redo())
+        self.assertEqual(len(self.board.journal), 3)
+        while self.board.undo() is not None:
+            pass
+        self.assertEqual(self.board.snapshot(), start)
+
+        self.board.load_puzzle(self.solution, self.puzzle)
+        self.assertEqual(len(self.board.journal), 0)
+
+    def test_go_to_move(self):
+        self.logger.info("running: test_go_to_move")
+
+        board = BoardModel()
+        board.load_puzzle(*generate_puzzle(30))
+        empty = [(x, y) for y in range(9) for x in range(9) if not board.is_clue(x, y)]
+        states = [(board.snapshot(), board.get_conflicts(), board.get_candidates(*empty[0]))]
+        for _ in range(1000):
+            x, y = random.choice(empty)
+            board.set_number(x, y, random.choice([n for n in range(10) if n != board.get_number(x, y)]))
+            states.append((board.snapshot(), board.get_conflicts(), board.get_candidates(*empty[0])))
+
+        for position in (0, 1000, 300, 299, 3, 998, 512, 700, 256):
+            board.go_to_move(position)
+            self.assertEqual(board.journal.position, position)
+            self.assertEqual(
+                (board.snapshot(), board.get_conflicts(), board.get_candidates(*empty[0])), states[position]
+            )
+        self.assertIsNotNone(board.redo())
+        with self.assertRaises(ValueError):
+            board.go_to_move(1001)
+
+    def test_listener(self):
+        self.logger.info("running: test_listener")
+
+        changed = []
+        self.board.add_listener(lambda x, y: changed.append((x, y)))
+
+        x, y = self.empty[0]
+        self.board.set_number(x, y, self.solution[y][x])
+        self.board.set_number(x, y, self.solution[y][x]) # unchanged
+        self.assertEqual(changed, [(x, y)])
+
+        self.board.load_puzzle(self.solution, self.puzzle)
+        self.assertEqual(len(changed), 82)
+
+    def test_larger_board(self):
+        self.logger.info("running: test_larger_board")
+
+        board = BoardModel(order=4)
+        board.create_puzzle()
+        self.assertEqual(sum(board.is_clue(x, y) for y in range(16) for x in range(16)), 255)
+        with self.assertRaises(ValueError):
+            board.create_puzzle(100)
+        board.create_puzzle(200)
+        self.assertEqual(board.size, 16)
+        with self.assertRaises(ValueError):
+            board.load_puzzle(self.solution, self.puzzle)
+
+        x, y = next((x, y) for y in range(16) for x in range(16) if not board.is_clue(x, y))
+        with self.assertRaises(ValueError):
+            board.set_number(x, y, 17)
+        board.set_number(x, y, 16)
+        self.assertEqual(board.get_number(x, y), 16)
+
+        while (hint := board.get_hint()) is not None:
+            board.set_number(hint.x, hint.y, hint.number)
+        self.assertTrue(board.is_complete())
+
+        with self.assertRaises(ValueError):
+            BoardModel(cache=PuzzleCache(generate_from_id), order=4)
+
+
+class TestImports(unittest.TestCase):
+    BUDGET = 0.5 # seconds the models may take to import, far above what they need
+
+    def setUp(self) -> None:
+        self.logger = logging.getLogger(__name__)
+
+    def test_models_import_without_tkinter(self):
+        self.logger.info("running: test_models_import_without_tkinter")
+
+        # in a fresh interpreter, as this one has imported all kinds of modules already
+        code = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import sudoku.models.model, sudoku.models.cell, sudoku.models.difficulty\n"
+            "print(time.perf_counter() - start, 'tkinter' in sys.modules)\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        seconds, has_tkinter = output.split()
+        self.assertEqual(has_tkinter, "False")
+        self.assertLess(float(seconds), self.BUDGET)
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
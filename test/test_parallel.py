@@ -0,0 +1,69 @@
+import unittest, random, logging
+from sudoku.models.model import PuzzleGenerator, SolutionGenerator, generate_puzzle
+from sudoku.models.parallel import ParallelSolver, SplitPool, parallel_backend, split
+from sudoku.models.solver import BitmaskSolver
+
+
+class TestParallelSolver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.pool = SplitPool(workers=2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.pool.close()
+
+    def setUp(self) -> None:
+        random.seed(21)
+        self.logger = logging.getLogger(__name__)
+
+    def test_split(self):
+        self.logger.info("running: test_split")
+
+        self.assertGreaterEqual(len(split([[0] * 9 for _ in range(9)], 8)), 8)
+
+        solution, puzzle = generate_puzzle(24)
+        subtrees = split(puzzle, 8) # fewer if branches run into clashes
+        cells = [value for row in solution for value in row]
+        # exactly one subtree holds the solution
+        self.assertEqual(sum(
+            all(value in (0, cells[i]) for i, value in enumerate(subtree)) for subtree in subtrees
+        ), 1)
+
+    def test_matches_bitmask_solver(self):
+        self.logger.info("running: test_matches_bitmask_solver")
+
+        solution, puzzle = generate_puzzle(26)
+        sparse = [row[:] for row in puzzle]
+        first = next(i for i in range(81) if puzzle[i // 9][i % 9])
+        sparse[first // 9][first % 9] = 0 # several solutions now, most likely
+        conflicting = [row[:] for row in puzzle]
+        conflicting[0][0] = conflicting[0][1] = 1
+        empty = [[0] * 9 for _ in range(9)]
+
+        for board in (puzzle, sparse, conflicting, empty):
+            for limit in (1, 2):
+                with self.subTest(limit=limit):
+                    solver = ParallelSolver(board, self.pool)
+                    self.assertEqual(
+                        solver.solve_multiple(limit), BitmaskSolver(board).solve_multiple(limit)
+                    )
+        solver = ParallelSolver(puzzle, self.pool)
+        solver.solve_multiple(2)
+        self.assertEqual(solver.solution, [list(row) for row in solution])
+
+    def test_generator(self):
+        self.logger.info("running: test_generator")
+
+        solution = SolutionGenerator(random.Random(2)).create()
+        generator = PuzzleGenerator(
+            solution, rng=random.Random(3), parallel=parallel_backend(self.pool), parallel_below=40
+        )
+        puzzle = generator.create(30)
+        expected = PuzzleGenerator(solution, rng=random.Random(3)).create(30)
+        self.assertEqual(puzzle, expected) # the same checks, only run elsewhere
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
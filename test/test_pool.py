@@ -0,0 +1,46 @@
+import unittest, time, logging
+from sudoku.models.model import BoardModel, generate_puzzle
+from sudoku.models.pool import PuzzlePool
+
+
+class TestPuzzlePool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pool = PuzzlePool(generate_puzzle, size=2)
+        self.logger = logging.getLogger(__name__)
+
+    def tearDown(self) -> None:
+        self.pool.stop()
+
+    def test_miss_when_empty(self):
+        self.logger.info("running: test_miss_when_empty")
+
+        solution, puzzle = self.pool.take(36)
+        self.assertEqual(sum(x != 0 for row in puzzle for x in row), 36)
+        self.assertEqual((self.pool.hits, self.pool.misses), (0, 1))
+
+    def test_refill_in_background(self):
+        self.logger.info("running: test_refill_in_background")
+
+        self.pool.reserve(36)
+        self.pool.start()
+
+        deadline = time.monotonic() + 10
+        while self.pool.available(36) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.pool.available(36), 2)
+
+        self.pool.take(36)
+        self.assertEqual((self.pool.hits, self.pool.misses), (1, 0))
+
+    def test_board_model_uses_pool(self):
+        self.logger.info("running: test_board_model_uses_pool")
+
+        board = BoardModel(self.pool)
+        board.create_puzzle(clues=38)
+        self.assertEqual(self.pool.misses, 1)
+        self.assertFalse(board.is_complete())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest, random, logging
+from sudoku.models.model import GenerationError, PuzzleGenerator, SolutionGenerator, generate_puzzle
+from sudoku.models.rater import LogicalSolver, Technique, rate
+
+
+class TestLogicalSolver(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(3)
+        self.logger = logging.getLogger(__name__)
+
+    def test_agrees_with_solution(self):
+        self.logger.info("running: test_agrees_with_solution")
+
+        for clues in (38, 31, 24):
+            with self.subTest(clues=clues):
+                solution, puzzle = generate_puzzle(clues)
+                solver = LogicalSolver(puzzle)
+                solved = solver.rate().solved
+
+                expected = [x for row in solution for x in row]
+                if solved:
+                    self.assertEqual(solver.cells, expected)
+                self.assertTrue(all(x in (0, y) for x, y in zip(solver.cells, expected)))
+
+    def test_singles_only(self):
+        self.logger.info("running: test_singles_only")
+
+        solution, puzzle = generate_puzzle(80)
+        score, hardest, solved = rate(puzzle)
+        self.assertEqual((score, hardest, solved), (1, Technique.NAKED_SINGLE, True))
+
+    def test_inconsistent_board(self):
+        self.logger.info("running: test_inconsistent_board")
+
+        board = [[0] * 9 for _ in range(9)]
+        board[0][0] = board[8][0] = 5
+        self.assertFalse(rate(board).solved)
+
+    def test_generator_rating(self):
+        self.logger.info("running: test_generator_rating")
+
+        generator = PuzzleGenerator(SolutionGenerator().create())
+        puzzle = generator.create(34, rating=(0, 50))
+        score, _, solved = rate(puzzle)
+        self.assertTrue(solved)
+        self.assertLessEqual(score, 50)
+
+        with self.assertRaisesRegex(GenerationError, "rated"):
+            generator.create(34, rating=(-2, -1), max_passes=3)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
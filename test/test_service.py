@@ -0,0 +1,98 @@
+import unittest, asyncio, json, logging, os, tempfile
+from sudoku.models.notation import from_string, to_string
+from sudoku.models.solver import BitmaskSolver
+from sudoku.service import MAX_LIMIT, PuzzleClient, PuzzleServer, ServiceError
+
+
+class TestPuzzleService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.directory.name, "sudoku.sock")
+        self.server = PuzzleServer(workers=2, linger=0.05)
+        await self.server.start(self.address)
+        self.logger = logging.getLogger(__name__)
+
+    async def asyncTearDown(self) -> None:
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def _request(self, *requests: dict) -> list[dict]:
+        """Sends the requests on one connection and returns the responses by id"""
+
+        reader, writer = await asyncio.open_unix_connection(self.address)
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        return sorted(responses, key=lambda response: response["id"])
+
+    async def test_generate(self):
+        self.logger.info("running: test_generate")
+
+        responses = await self._request(
+            {"id": 1, "op": "generate", "clues": 36},
+            {"id": 2, "op": "generate", "difficulty": "expert"},
+        )
+        for response, clues in zip(responses, (36, 31)):
+            puzzle = from_string(response["puzzle"])
+            solver = BitmaskSolver(puzzle)
+            self.assertEqual(solver.solve_multiple(), 1)
+            self.assertEqual(to_string(solver.solution), response["solution"])
+            self.assertEqual(81 - response["puzzle"].count("."), clues)
+
+    async def test_batches_and_coalesces(self):
+        self.logger.info("running: test_batches_and_coalesces")
+
+        puzzle = "." * 81
+        responses = await self._request(
+            *({"id": n, "op": "generate", "clues": 38} for n in range(6)),
+            *({"id": 6 + n, "op": "solve", "puzzle": puzzle, "limit": 2} for n in range(3)),
+        )
+        self.assertEqual(len({response["puzzle"] for response in responses[:6]}), 6)
+        for response in responses[6:]:
+            self.assertEqual(response["count"], 2)
+        self.assertEqual(self.server.coalesced, 2)
+        self.assertEqual(self.server.batches, 3) # generate split over 2 workers, one solve
+
+    async def test_errors(self):
+        self.logger.info("running: test_errors")
+
+        responses = await self._request(
+            {"id": 1, "op": "shuffle"},
+            {"id": 2, "op": "solve", "puzzle": "123"},
+            {"id": 3, "op": "generate", "clues": 5},
+            {"id": 4, "op": "generate", "clues": 20},
+            {"id": 5, "op": "solve", "puzzle": "." * 81, "limit": 0},
+        )
+        for response in responses:
+            self.assertIn("error", response)
+
+    async def test_solve_limit(self):
+        self.logger.info("running: test_solve_limit")
+
+        empty = "." * 81
+        responses = await self._request(
+            {"id": 1, "op": "solve", "puzzle": empty},
+            {"id": 2, "op": "solve", "puzzle": empty, "limit": 10 ** 9},
+        )
+        self.assertEqual([response["count"] for response in responses], [2, MAX_LIMIT])
+
+    async def test_client(self):
+        self.logger.info("running: test_client")
+
+        def use_client() -> tuple[int, list[list[int]] | None]:
+            with PuzzleClient(self.address) as client:
+                solution, puzzle = client.generate(34)
+                with self.assertRaises(ServiceError):
+                    client.generate(3)
+                return client.solve(puzzle), solution
+
+        (count, solved), solution = await asyncio.to_thread(use_client)
+        self.assertEqual(count, 1)
+        self.assertEqual(tuple(tuple(row) for row in solved), solution)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest, io, logging, importlib.util
+from solve import Status, parse_args, read_puzzles, run
+from sudoku.models.model import generate_puzzle
+from sudoku.models.notation import to_string
+
+
+class TestSolve(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pairs = [generate_puzzle(30) for _ in range(5)]
+        conflicting = "11" + "." * 79
+        self.lines = [
+            f"{to_string(self.pairs[0][1])} extra columns are ignored",
+            "# a comment",
+            "." * 81,
+            conflicting,
+            "",
+            "12345",
+            *(to_string(puzzle) for _, puzzle in self.pairs[1:]),
+        ]
+        self.logger = logging.getLogger(__name__)
+
+    def _solve(self, argv: list[str]) -> tuple[list[list[str]], dict]:
+        output = io.StringIO()
+        statuses = run(parse_args(argv), read_puzzles([io.StringIO("\n".join(self.lines))]), output)
+        return [line.split() for line in output.getvalue().splitlines()], statuses
+
+    def test_check(self):
+        self.logger.info("running: test_check")
+
+        results, statuses = self._solve(["--check", "-w", "2", "--chunk-size", "2"])
+        self.assertEqual(
+            [status for _, status, _ in results],
+            [Status.UNIQUE, Status.MULTIPLE, Status.UNSOLVABLE, Status.INVALID] + [Status.UNIQUE] * 4
+        )
+        self.assertEqual(statuses[Status.UNIQUE], 5)
+
+        unique = [results[0]] + results[4:]
+        for (solution, puzzle), (line_puzzle, _, line_solution) in zip(self.pairs, unique):
+            self.assertEqual(line_puzzle, to_string(puzzle))
+            self.assertEqual(line_solution, to_string(solution))
+        self.assertEqual(results[2][2], "-")
+
+    def test_solve(self):
+        self.logger.info("running: test_solve")
+
+        for solver in ("backtracking", "bitmask", "dlx", "propagating"):
+            with self.subTest(solver=solver):
+                results, statuses = self._solve(["--solver", solver, "-w", "1", "--chunk-size", "3"])
+                self.assertEqual(len(results), 8)
+                self.assertEqual(results[1][1], Status.SOLVED) # any solution of the empty grid
+                self.assertEqual(results[-1][2], to_string(self.pairs[-1][0]))
+                self.assertEqual(statuses[Status.SOLVED], 6)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "needs NumPy")
+    def test_batch(self):
+        self.logger.info("running: test_batch")
+
+        for argv in (["--check"], []):
+            with self.subTest(argv=argv):
+                expected = self._solve(argv + ["-w", "1"])
+                self.assertEqual(self._solve(argv + ["--batch", "-w", "2", "--chunk-size", "3"]), expected)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
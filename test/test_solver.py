@@ -0,0 +1,153 @@
+import unittest, random, logging
+from copy import deepcopy
+from sudoku.models.model import SolutionGenerator, PuzzleGenerator, SudokuSolver, get_solver
+from sudoku.models.dlx import DancingLinksSolver
+from sudoku.models.solver import BitmaskSolver, PropagatingSolver, SearchLimitError
+
+
+class TestBitmaskSolver(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(7)
+        self.solution = SolutionGenerator().create()
+        self.logger = logging.getLogger(__name__)
+
+    def test_unique_puzzle(self):
+        self.logger.info("running: test_unique_puzzle")
+
+        puzzle = PuzzleGenerator(self.solution).create(30)
+        solver = BitmaskSolver(puzzle)
+
+        self.assertEqual(solver.solve_multiple(), 1)
+        self.assertEqual(solver.solution, [list(row) for row in self.solution])
+
+    def test_limit_stops_early(self):
+        self.logger.info("running: test_limit_stops_early")
+
+        empty = [[0] * 9 for _ in range(9)]
+        self.assertEqual(BitmaskSolver(empty).solve_multiple(limit=2), 2)
+
+    def test_inconsistent_board(self):
+        self.logger.info("running: test_inconsistent_board")
+
+        board = [[0] * 9 for _ in range(9)]
+        board[0][0] = board[0][8] = 5
+        self.assertEqual(BitmaskSolver(board).solve_multiple(), 0)
+
+    def test_set_cell(self):
+        self.logger.info("running: test_set_cell")
+
+        solver = BitmaskSolver([[0] * 9 for _ in range(9)])
+        self.assertTrue(solver.set_cell(0, 5))
+        self.assertFalse(solver.set_cell(1, 5)) # taken in the row
+        self.assertTrue(solver.set_cell(1, 6))
+        self.assertEqual(solver.solve_multiple(limit=2), 2)
+        self.assertEqual(solver.solution[0][:2], [5, 6])
+
+        self.assertTrue(solver.set_cell(0, 0))
+        self.assertTrue(solver.set_cell(1, 5))
+        self.assertEqual(solver.solve_multiple(limit=1), 1)
+        self.assertEqual(solver.solution[0][1], 5)
+
+    def test_matches_reference_solver(self):
+        self.logger.info("running: test_matches_reference_solver")
+
+        for i in range(10):
+            with self.subTest(i=i):
+                board = [[0] * 9 for _ in range(9)]
+                for j in random.sample(range(81), 40):
+                    board[j // 9][j % 9] = self.solution[j // 9][j % 9]
+
+                expected = SudokuSolver(deepcopy(board)).solve_multiple()
+                self.assertEqual(BitmaskSolver(board).solve_multiple(), expected)
+
+    def test_reference_solver_inconsistent_board(self):
+        self.logger.info("running: test_reference_solver_inconsistent_board")
+
+        board = [[0] * 9 for _ in range(9)]
+        board[0][0] = board[0][1] = 1
+        self.assertEqual(SudokuSolver(board).solve_multiple(), 0)
+        board[0][1] = 10
+        self.assertEqual(SudokuSolver(board).solve_multiple(), 0)
+        self.assertEqual(SudokuSolver([[0] * 9 for _ in range(8)] + [[0] * 8]).solve_multiple(), 0)
+
+
+class TestDancingLinksSolver(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(11)
+        self.solution = SolutionGenerator().create()
+        self.logger = logging.getLogger(__name__)
+
+    def test_unique_puzzle(self):
+        self.logger.info("running: test_unique_puzzle")
+
+        puzzle = PuzzleGenerator(self.solution, DancingLinksSolver).create(32)
+        solver = DancingLinksSolver(puzzle)
+
+        self.assertEqual(solver.solve_multiple(), 1)
+        self.assertEqual(solver.solution, [list(row) for row in self.solution])
+
+    def test_matches_bitmask_solver(self):
+        self.logger.info("running: test_matches_bitmask_solver")
+
+        for i in range(10):
+            with self.subTest(i=i):
+                board = [[0] * 9 for _ in range(9)]
+                for j in random.sample(range(81), 30):
+                    board[j // 9][j % 9] = self.solution[j // 9][j % 9]
+
+                self.assertEqual(
+                    DancingLinksSolver(board).solve_multiple(limit=50),
+                    BitmaskSolver(board).solve_multiple(limit=50)
+                )
+
+    def test_get_solver(self):
+        self.logger.info("running: test_get_solver")
+
+        self.assertIs(get_solver("dlx"), DancingLinksSolver)
+        with self.assertRaises(ValueError):
+            get_solver("quantum")
+
+
+class TestPropagatingSolver(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = random.Random(13)
+        self.logger = logging.getLogger(__name__)
+
+    def test_matches_bitmask_solver(self):
+        self.logger.info("running: test_matches_bitmask_solver")
+
+        solution = SolutionGenerator(self.rng).create()
+        for i in range(10):
+            with self.subTest(i=i):
+                board = [[0] * 9 for _ in range(9)]
+                for j in self.rng.sample(range(81), 28):
+                    board[j // 9][j % 9] = solution[j // 9][j % 9]
+
+                self.assertEqual(
+                    PropagatingSolver(board).solve_multiple(limit=50),
+                    BitmaskSolver(board).solve_multiple(limit=50)
+                )
+
+    def test_max_nodes(self):
+        self.logger.info("running: test_max_nodes")
+
+        empty = [[0] * 9 for _ in range(9)]
+        with self.assertRaises(SearchLimitError):
+            PropagatingSolver(empty, max_nodes=10).solve_multiple(limit=100)
+        self.assertEqual(PropagatingSolver(empty, max_nodes=200).solve_multiple(limit=2), 2)
+
+    def test_larger_boards(self):
+        self.logger.info("running: test_larger_boards")
+
+        solution = SolutionGenerator(self.rng, order=4).create()
+        puzzle = PuzzleGenerator(solution, rng=self.rng).create(130)
+        for backend in (BitmaskSolver, DancingLinksSolver, PropagatingSolver):
+            with self.subTest(backend=backend.__name__):
+                solver = backend(puzzle)
+                self.assertEqual(solver.solve_multiple(), 1)
+                self.assertEqual(solver.solution, [list(row) for row in solution])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest, random, logging, json, os, tempfile
+from sudoku.models.model import BoardModel, SolutionGenerator, PuzzleGenerator, SOLVER_BACKENDS
+from sudoku.stats import STATS
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(3)
+        STATS.reset()
+        self.logger = logging.getLogger(__name__)
+
+    def tearDown(self) -> None:
+        STATS.disable()
+        STATS.reset()
+
+    def test_nothing_recorded_when_disabled(self):
+        self.logger.info("running: test_nothing_recorded_when_disabled")
+
+        PuzzleGenerator(SolutionGenerator().create()).create(36)
+        BoardModel().create_puzzle(clues=36)
+        self.assertEqual(STATS.snapshot(), {"counters": {}, "timers": {}})
+
+    def test_solver_nodes(self):
+        self.logger.info("running: test_solver_nodes")
+
+        STATS.enable()
+        puzzle = PuzzleGenerator(SolutionGenerator().create()).create(30)
+        STATS.reset()
+        for name, backend in SOLVER_BACKENDS.items():
+            solver = backend([row[:] for row in puzzle])
+            solver.solve_multiple()
+            self.assertGreater(solver.nodes, 0, name)
+            self.assertGreaterEqual(solver.nodes, solver.backtracks, name)
+        self.assertEqual(STATS.counter("solver.solves"), len(SOLVER_BACKENDS))
+        self.assertGreater(STATS.counter("solver.nodes"), 0)
+
+    def test_generator_attempts(self):
+        self.logger.info("running: test_generator_attempts")
+
+        STATS.enable()
+        generator = PuzzleGenerator(SolutionGenerator().create())
+        generator.create(24)
+        self.assertEqual(STATS.counter("generator.attempts"), generator.attempts)
+        self.assertEqual(STATS.get_timer("generator.attempt")["count"], generator.attempts)
+
+    def test_create_puzzle_latency(self):
+        self.logger.info("running: test_create_puzzle_latency")
+
+        STATS.enable()
+        BoardModel().create_puzzle(clues=36)
+        self.assertEqual(STATS.get_timer("board.create_puzzle")["count"], 1)
+        self.assertEqual(STATS.counter("board.create_puzzle.generated"), 1)
+
+    def test_dump(self):
+        self.logger.info("running: test_dump")
+
+        STATS.count("a", 2)
+        STATS.record("b", 0.5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stats.json")
+            STATS.dump(path)
+            with open(path) as file:
+                stats = json.load(file)
+        self.assertEqual(stats["counters"], {"a": 2})
+        self.assertEqual(stats["timers"]["b"]["mean_ms"], 500)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest, random, logging
+from sudoku.models.model import SolutionGenerator
+from sudoku.models.solver import UNITS, fill_grid
+from sudoku.models.symmetry import IDENTITY, make_transform, random_transform
+
+
+def is_valid(cells: tuple[int, ...] | list[int]) -> bool:
+    return all(sorted(cells[i] for i in unit) == list(range(1, 10)) for unit in UNITS)
+
+
+class TestSymmetry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = random.Random(11)
+        self.grid = tuple(fill_grid(self.rng))
+        self.logger = logging.getLogger(__name__)
+
+    def test_fill_grid(self):
+        self.logger.info("running: test_fill_grid")
+
+        self.assertTrue(is_valid(self.grid))
+        self.assertNotEqual(self.grid, tuple(fill_grid(self.rng)))
+
+    def test_transforms_keep_grids_valid(self):
+        self.logger.info("running: test_transforms_keep_grids_valid")
+
+        self.assertEqual(IDENTITY.apply(self.grid), self.grid)
+        for _ in range(50):
+            self.assertTrue(is_valid(random_transform(self.rng).apply(self.grid)))
+
+    def test_transpose(self):
+        self.logger.info("running: test_transpose")
+
+        transposed = make_transform(list(range(9)), list(range(9)), True, IDENTITY.digits)
+        cells = transposed.apply(self.grid)
+        self.assertTrue(all(cells[r * 9 + c] == self.grid[c * 9 + r] for r in range(9) for c in range(9)))
+
+    def test_reseeding(self):
+        self.logger.info("running: test_reseeding")
+
+        generator = SolutionGenerator(self.rng, reseed_every=5)
+        solutions = [generator.create() for _ in range(20)]
+        for solution in solutions:
+            self.assertTrue(is_valid([value for row in solution for value in row]))
+        self.assertEqual(len(set(solutions)), 20)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()